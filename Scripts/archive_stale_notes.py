@@ -6,85 +6,129 @@ This script scans the Notes and Projects directories for files that haven't been
 modified in a specified timeframe and moves them to the Archive directory.
 """
 
+import io
 import os
 import shutil
+import time
 import datetime
 import yaml
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Set, TextIO, Tuple
+
+try:
+    from yaml import CSafeDumper as YamlDumper, CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as YamlDumper, SafeLoader as YamlLoader
+
+from vault import iter_markdown_files
 
 # Configuration
 STALE_THRESHOLD_DAYS = 180  # 6 months
+SECONDS_PER_DAY = 24 * 60 * 60
 NOTES_DIR = "../02-Notes"
 PROJECTS_DIR = "../03-Projects"
 ARCHIVE_DIR = "../05-Archive"
 ARCHIVE_LOG = os.path.join(ARCHIVE_DIR, "log.md")
+LOG_BUFFER_SIZE = 128 * 1024
+
+# Directories already created during this run
+_created_dirs: Set[str] = set()
 
 def get_stale_files(directory: str, days: int) -> List[Tuple[str, datetime.datetime]]:
     """Find files that haven't been modified in the specified number of days."""
     stale_files = []
-    now = datetime.datetime.now()
+    # Compare raw timestamps; stale means more than `days` whole days old
+    cutoff = time.time() - (days + 1) * SECONDS_PER_DAY
     
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if not file.endswith('.md'):
-                continue
-                
-            file_path = os.path.join(root, file)
-            modified_time = datetime.datetime.fromtimestamp(
-                os.path.getmtime(file_path)
-            )
-            
-            if (now - modified_time).days > days:
-                stale_files.append((file_path, modified_time))
+    for entry in iter_markdown_files(directory):
+        mtime = entry.stat().st_mtime
+        
+        if mtime <= cutoff:
+            stale_files.append((entry.path, datetime.datetime.fromtimestamp(mtime)))
     
     return stale_files
 
-def update_file_metadata(file_path: str) -> None:
-    """Add archived tag to file's YAML frontmatter."""
-    with open(file_path, 'r') as f:
-        content = f.read()
+def add_archived_metadata(file_path: str, content: str, today: str) -> Optional[str]:
+    """Return content with the archived tag added to its YAML frontmatter.
     
+    Returns None when the file has no frontmatter or it can't be updated.
+    """
     # Check if file has YAML frontmatter
-    if content.startswith('---'):
-        try:
-            # Split content into frontmatter and body
-            _, fm, body = content.split('---', 2)
-            metadata = yaml.safe_load(fm)
-            
-            # Add archived tag if not present
-            if 'tags' in metadata:
-                if 'archived' not in metadata['tags']:
-                    metadata['tags'].append('archived')
-            else:
-                metadata['tags'] = ['archived']
-                
-            # Update archive date
-            metadata['archived_date'] = datetime.datetime.now().strftime('%Y-%m-%d')
+    if not content.startswith('---'):
+        return None
+    
+    # Slice frontmatter and body at the closing delimiter
+    end = content.find('\n---', 3)
+    if end < 0:
+        return None
+    fm = content[3:end]
+    body = content[end + len('\n---'):]
+    
+    try:
+        metadata = yaml.load(fm, Loader=YamlLoader)
+        
+        # Add archived tag if not present
+        if 'tags' in metadata:
+            if 'archived' not in metadata['tags']:
+                metadata['tags'].append('archived')
+        else:
+            metadata['tags'] = ['archived']
             
-            # Write updated content
-            with open(file_path, 'w') as f:
-                f.write('---\n')
-                yaml.dump(metadata, f)
-                f.write('---\n')
-                f.write(body)
-        except Exception as e:
-            print(f"Error updating metadata for {file_path}: {e}")
+        # Update archive date
+        metadata['archived_date'] = today
+        
+        # Assemble the whole note in memory so it goes out in one write
+        buffer = io.StringIO()
+        buffer.write('---\n')
+        yaml.dump(metadata, buffer, Dumper=YamlDumper)
+        buffer.write('---\n')
+        buffer.write(body)
+        return buffer.getvalue()
+    except Exception as e:
+        print(f"Error updating metadata for {file_path}: {e}")
+        return None
+
+def ensure_directory(directory: str) -> None:
+    """Create directory and its parents, at most once per run."""
+    if directory not in _created_dirs:
+        os.makedirs(directory, exist_ok=True)
+        _created_dirs.add(directory)
+
+def archive_file(file_path: str, archive_path: str, today: str) -> None:
+    """Move a file into the archive, tagging its metadata on the way."""
+    with open(file_path, 'r') as f:
+        content = f.read()
+    
+    updated = add_archived_metadata(file_path, content, today)
+    if updated is None:
+        # Nothing to rewrite, so a plain rename is enough
+        shutil.move(file_path, archive_path)
+        return
+    
+    # Write the updated note straight to its archive location
+    with open(archive_path, 'w') as f:
+        f.write(updated)
+    shutil.copymode(file_path, archive_path)
+    os.unlink(file_path)
 
-def log_archived_file(file_path: str, modified_time: datetime.datetime) -> None:
-    """Log archived file details to the archive log."""
-    archive_entry = (
-        f"\n## Archived on {datetime.datetime.now().strftime('%Y-%m-%d')}\n"
+def log_archived_file(
+    log: TextIO,
+    file_path: str,
+    modified_time: datetime.datetime,
+    today: str
+) -> None:
+    """Log archived file details to the open archive log."""
+    log.write(
+        f"\n## Archived on {today}\n"
         f"- File: `{file_path}`\n"
         f"- Last modified: {modified_time.strftime('%Y-%m-%d')}\n"
         f"- Reason: No updates for {STALE_THRESHOLD_DAYS} days\n"
     )
-    
-    with open(ARCHIVE_LOG, 'a') as f:
-        f.write(archive_entry)
 
 def archive_stale_files() -> None:
     """Main function to archive stale files."""
+    today = datetime.datetime.now().strftime('%Y-%m-%d')
+    
     # Ensure archive directory exists
     os.makedirs(ARCHIVE_DIR, exist_ok=True)
     
@@ -93,37 +137,37 @@ def archive_stale_files() -> None:
         with open(ARCHIVE_LOG, 'w') as f:
             f.write("# Archive Log\n\nLog of files moved to archive.\n")
     
-    # Process notes
-    stale_notes = get_stale_files(NOTES_DIR, STALE_THRESHOLD_DAYS)
-    print(f"\nFound {len(stale_notes)} stale notes:")
-    for file_path, modified_time in stale_notes:
-        print(f"- {file_path} (last modified: {modified_time.strftime('%Y-%m-%d')})")
+    # Keep the log open for the whole run so entries are written in one go
+    with open(ARCHIVE_LOG, 'a', buffering=LOG_BUFFER_SIZE) as log:
+        # Process notes
+        stale_notes = get_stale_files(NOTES_DIR, STALE_THRESHOLD_DAYS)
+        print(f"\nFound {len(stale_notes)} stale notes:")
+        for file_path, modified_time in stale_notes:
+            print(f"- {file_path} (last modified: {modified_time.strftime('%Y-%m-%d')})")
         
-        # Create archive directory structure
-        relative_path = os.path.relpath(file_path, NOTES_DIR)
-        archive_path = os.path.join(ARCHIVE_DIR, 'notes', relative_path)
-        os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+            # Create archive directory structure
+            relative_path = os.path.relpath(file_path, NOTES_DIR)
+            archive_path = os.path.join(ARCHIVE_DIR, 'notes', relative_path)
+            ensure_directory(os.path.dirname(archive_path))
         
-        # Update metadata and move file
-        update_file_metadata(file_path)
-        shutil.move(file_path, archive_path)
-        log_archived_file(file_path, modified_time)
+            # Update metadata and move file
+            archive_file(file_path, archive_path, today)
+            log_archived_file(log, file_path, modified_time, today)
     
-    # Process projects
-    stale_projects = get_stale_files(PROJECTS_DIR, STALE_THRESHOLD_DAYS)
-    print(f"\nFound {len(stale_projects)} stale projects:")
-    for file_path, modified_time in stale_projects:
-        print(f"- {file_path} (last modified: {modified_time.strftime('%Y-%m-%d')})")
+        # Process projects
+        stale_projects = get_stale_files(PROJECTS_DIR, STALE_THRESHOLD_DAYS)
+        print(f"\nFound {len(stale_projects)} stale projects:")
+        for file_path, modified_time in stale_projects:
+            print(f"- {file_path} (last modified: {modified_time.strftime('%Y-%m-%d')})")
         
-        # Create archive directory structure
-        relative_path = os.path.relpath(file_path, PROJECTS_DIR)
-        archive_path = os.path.join(ARCHIVE_DIR, 'projects', relative_path)
-        os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+            # Create archive directory structure
+            relative_path = os.path.relpath(file_path, PROJECTS_DIR)
+            archive_path = os.path.join(ARCHIVE_DIR, 'projects', relative_path)
+            ensure_directory(os.path.dirname(archive_path))
         
-        # Update metadata and move file
-        update_file_metadata(file_path)
-        shutil.move(file_path, archive_path)
-        log_archived_file(file_path, modified_time)
+            # Update metadata and move file
+            archive_file(file_path, archive_path, today)
+            log_archived_file(log, file_path, modified_time, today)
 
 if __name__ == "__main__":
     try:
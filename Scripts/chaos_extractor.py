@@ -10,13 +10,26 @@ import os
 import re
 import yaml
 import datetime
+from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Set, Tuple
 
 # Configuration
 CHAOS_PIT = "../01-Daily/chaos-pit.md"
 NOTES_DIR = "../02-Notes"
 PROJECTS_DIR = "../03-Projects"
+READ_BUFFER_SIZE = 128 * 1024
+
+# Patterns
+_TASK_RE = re.compile(r'^[-*] \[ \]|\btodo\b|task:', re.IGNORECASE)
+_TAG_RE = re.compile(r'#(\w+)')
+_ENTRY_RE = re.compile(r'(?m)(?:^[^\S\n]*[^#\s].*(?:\n|$))+')
+_LINE_PADDING_RE = re.compile(r'[^\S\n]*\n[^\S\n]*')
+_NON_WORD_RE = re.compile(r'[^\w\s-]')
+_DASH_RE = re.compile(r'[-\s]+')
+
+# Directories already created during this run
+_created_dirs: Set[str] = set()
 
 class ChaosPitEntry:
     """Represents a single entry from the chaos pit."""
@@ -28,7 +41,7 @@ class ChaosPitEntry:
     def _determine_type(self) -> str:
         """Determine the type of entry based on content and tags."""
         # Check for task markers
-        if re.match(r'^[-*] \[ \]|\btodo\b|task:', self.content.lower()):
+        if _TASK_RE.match(self.content):
             return 'task'
         
         # Check for concept/idea markers
@@ -42,57 +55,41 @@ class ChaosPitEntry:
         # Default to note
         return 'note'
 
+def ensure_directory(directory: str) -> None:
+    """Create directory and its parents, at most once per run."""
+    if directory not in _created_dirs:
+        os.makedirs(directory, exist_ok=True)
+        _created_dirs.add(directory)
+
 def parse_chaos_pit() -> List[ChaosPitEntry]:
-    """Parse the chaos-pit.md file into structured entries."""
-    entries = []
-    current_entry = []
-    current_tags = []
+    """Parse the chaos-pit.md file into structured entries.
     
+    An entry is a run of consecutive non-blank, non-header lines; a
+    single regex scan over the file finds every run.
+    """
     try:
-        with open(CHAOS_PIT, 'r') as f:
-            lines = f.readlines()
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Skip empty lines and headers
-            if not line or line.startswith('#'):
-                if current_entry:
-                    entries.append(ChaosPitEntry(
-                        '\n'.join(current_entry),
-                        current_tags
-                    ))
-                    current_entry = []
-                    current_tags = []
-                continue
-            
-            # Extract tags
-            tags = re.findall(r'#(\w+)', line)
-            if tags:
-                current_tags.extend(tags)
-            
-            # Add line to current entry
-            current_entry.append(line)
-        
-        # Add final entry if exists
-        if current_entry:
-            entries.append(ChaosPitEntry(
-                '\n'.join(current_entry),
-                current_tags
-            ))
-    
+        with open(CHAOS_PIT, 'r', buffering=READ_BUFFER_SIZE) as f:
+            data = f.read()
     except FileNotFoundError:
         print(f"Error: {CHAOS_PIT} not found")
         return []
     
+    entries = []
+    for match in _ENTRY_RE.finditer(data):
+        block = match.group()
+        entries.append(ChaosPitEntry(
+            _LINE_PADDING_RE.sub('\n', block.strip()),
+            _TAG_RE.findall(block)
+        ))
+    
     return entries
 
-def create_note(entry: ChaosPitEntry) -> str:
+def create_note(entry: ChaosPitEntry, today: str) -> str:
     """Create a new note from a chaos pit entry."""
     # Generate filename from first line of content
     first_line = entry.content.split('\n')[0]
-    filename = re.sub(r'[^\w\s-]', '', first_line.lower())
-    filename = re.sub(r'[-\s]+', '-', filename)
+    filename = _NON_WORD_RE.sub('', first_line.lower())
+    filename = _DASH_RE.sub('-', filename)
     
     if entry.entry_type == 'concept':
         filepath = os.path.join(NOTES_DIR, 'concepts', f"{filename}.md")
@@ -100,14 +97,14 @@ def create_note(entry: ChaosPitEntry) -> str:
         filepath = os.path.join(NOTES_DIR, 'questions', f"{filename}.md")
     
     # Ensure directory exists
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    ensure_directory(os.path.dirname(filepath))
     
     # Create note content with YAML frontmatter
     content = [
         "---",
         "title: " + first_line,
         "tags: [" + ", ".join(f'"{tag}"' for tag in entry.tags) + "]",
-        "created: " + datetime.datetime.now().strftime('%Y-%m-%d'),
+        "created: " + today,
         "source: chaos-pit",
         "---",
         "",
@@ -119,19 +116,25 @@ def create_note(entry: ChaosPitEntry) -> str:
     
     return filepath
 
-def add_to_project(entry: ChaosPitEntry) -> str:
-    """Add entry to appropriate project file."""
-    # Find project tag
+def get_project_name(entry: ChaosPitEntry) -> str:
+    """Return the project an entry belongs to, based on its tags."""
     project_tag = next(
         (tag for tag in entry.tags if tag.startswith('project-')),
         'uncategorized'
     )
     
-    project_name = project_tag.replace('project-', '')
+    return project_tag.replace('project-', '')
+
+def add_to_project(
+    project_name: str,
+    entries: List[ChaosPitEntry],
+    today: str
+) -> str:
+    """Add entries to the project's tasks file in a single write."""
     project_dir = os.path.join(PROJECTS_DIR, project_name)
     
     # Create project directory if it doesn't exist
-    os.makedirs(project_dir, exist_ok=True)
+    ensure_directory(project_dir)
     
     # Add to tasks.md in project directory
     tasks_file = os.path.join(project_dir, 'tasks.md')
@@ -140,8 +143,9 @@ def add_to_project(entry: ChaosPitEntry) -> str:
             f.write("# Project Tasks\n\n")
     
     with open(tasks_file, 'a') as f:
-        f.write(f"\n## Added {datetime.datetime.now().strftime('%Y-%m-%d')}\n")
-        f.write(entry.content + "\n")
+        for entry in entries:
+            f.write(f"\n## Added {today}\n")
+            f.write(entry.content + "\n")
     
     return tasks_file
 
@@ -158,16 +162,22 @@ def main() -> None:
     """Main function to process chaos pit entries."""
     print("Processing chaos pit...")
     
+    today = datetime.datetime.now().strftime('%Y-%m-%d')
     entries = parse_chaos_pit()
     processed_files = []
+    project_entries = defaultdict(list)
     
     for entry in entries:
         if entry.entry_type in ['concept', 'note']:
-            filepath = create_note(entry)
+            filepath = create_note(entry, today)
             processed_files.append(('note', filepath))
         elif entry.entry_type in ['task', 'project']:
-            filepath = add_to_project(entry)
-            processed_files.append(('task', filepath))
+            project_entries[get_project_name(entry)].append(entry)
+    
+    # Write each project's tasks file once, however many entries target it
+    for project_name, project_items in project_entries.items():
+        filepath = add_to_project(project_name, project_items, today)
+        processed_files.extend(('task', filepath) for _ in project_items)
     
     # Report results
     print("\nProcessed entries:")
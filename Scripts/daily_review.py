@@ -9,33 +9,86 @@ and prompts for necessary review actions.
 import os
 import yaml
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Any, Callable, Dict, Hashable, Iterable, List, TextIO, Tuple
+
+from vault import iter_markdown_files, relative_to_root
 
 # Configuration
 DAILY_DIR = "../01-Daily"
 NOTES_DIR = "../02-Notes"
 PROJECTS_DIR = "../03-Projects"
 REVIEW_TEMPLATE = os.path.join(DAILY_DIR, "review-template.md")
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+IO_BUFFER_SIZE = 128 * 1024
+
+def split_subtrees(directories: List[str]) -> Tuple[List[os.DirEntry], List[str]]:
+    """Split directories into their top-level markdown files and child subtrees."""
+    top_level_files = []
+    subtrees = []
+    
+    for directory in directories:
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subtrees.append(entry.path)
+                    elif entry.name.endswith('.md'):
+                        top_level_files.append(entry)
+        except OSError:
+            continue
+    
+    return top_level_files, subtrees
+
+def scan_in_parallel(
+    directories: List[str],
+    scan: Callable[[Iterable[os.DirEntry]], Any]
+) -> List[Any]:
+    """Run scan over each top-level subtree of directories in a thread pool."""
+    top_level_files, subtrees = split_subtrees(directories)
+    
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = list(executor.map(
+            lambda subtree: scan(iter_markdown_files(subtree)),
+            subtrees
+        ))
+    
+    return [scan(top_level_files)] + results
+
+def recent_entries(
+    entries: Iterable[os.DirEntry],
+    cutoff: float
+) -> List[Tuple[str, datetime.datetime, Hashable]]:
+    """Return (path, modified time, file id) for entries modified after cutoff."""
+    recent_files = []
+    
+    for entry in entries:
+        stat = entry.stat()
+        if stat.st_mtime > cutoff:
+            modified_time = datetime.datetime.fromtimestamp(stat.st_mtime)
+            # The inode identifies files reachable by more than one path;
+            # fall back to the path where the platform doesn't report one
+            file_id = (stat.st_dev, stat.st_ino) if stat.st_ino else entry.path
+            recent_files.append((entry.path, modified_time, file_id))
+    
+    return recent_files
 
 def get_recent_files(days: int = 7) -> List[Tuple[str, datetime.datetime]]:
     """Get files modified in the last N days."""
     recent_files = []
-    cutoff = datetime.datetime.now() - datetime.timedelta(days=days)
-    
-    for directory in [DAILY_DIR, NOTES_DIR, PROJECTS_DIR]:
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if not file.endswith('.md'):
-                    continue
-                    
-                file_path = os.path.join(root, file)
-                modified_time = datetime.datetime.fromtimestamp(
-                    os.path.getmtime(file_path)
-                )
-                
-                if modified_time > cutoff:
-                    recent_files.append((file_path, modified_time))
+    seen = set()
+    cutoff = (datetime.datetime.now() - datetime.timedelta(days=days)).timestamp()
+    
+    for fragment in scan_in_parallel(
+        [DAILY_DIR, NOTES_DIR, PROJECTS_DIR],
+        lambda entries: recent_entries(entries, cutoff)
+    ):
+        for file_path, modified_time, file_id in fragment:
+            if file_id in seen:
+                continue
+            seen.add(file_id)
+            recent_files.append((file_path, modified_time))
     
     return sorted(recent_files, key=lambda x: x[1], reverse=True)
 
@@ -49,11 +102,11 @@ def get_unreviewed_logs() -> List[str]:
         
         file_path = os.path.join(DAILY_DIR, file)
         try:
-            with open(file_path, 'r') as f:
-                content = f.read()
+            # Check if file has been reviewed, stopping at the marker line
+            with open(file_path, 'r', buffering=IO_BUFFER_SIZE) as f:
+                reviewed = any('- [x] Daily review completed' in line for line in f)
             
-            # Check if file has been reviewed
-            if '- [x] Daily review completed' not in content:
+            if not reviewed:
                 unreviewed.append(file_path)
         except Exception as e:
             print(f"Error checking {file_path}: {e}")
@@ -106,16 +159,14 @@ def create_daily_log() -> str:
     
     return log_path
 
-def generate_review_summary() -> str:
-    """Generate a summary of recent activity."""
-    summary = ["# Review Summary\n"]
+def write_review_summary(out: TextIO) -> None:
+    """Write a summary of recent activity to out, section by section."""
+    out.write("# Review Summary\n\n")
     
     # Get recent activity
     recent_files = get_recent_files(7)
-    summary.extend([
-        "## Recent Activity",
-        f"Last 7 days ({len(recent_files)} files):\n"
-    ])
+    out.write("## Recent Activity\n")
+    out.write(f"Last 7 days ({len(recent_files)} files):\n\n")
     
     # Group by day
     by_day = {}
@@ -126,33 +177,29 @@ def generate_review_summary() -> str:
         by_day[day].append((file_path, modified_time))
     
     for day in sorted(by_day.keys(), reverse=True):
-        summary.append(f"\n### {day}")
+        out.write(f"\n### {day}\n")
         for file_path, modified_time in by_day[day]:
-            relative_path = os.path.relpath(file_path, "..")
-            summary.append(f"- `{relative_path}`")
+            relative_path = relative_to_root(file_path)
+            out.write(f"- `{relative_path}`\n")
     
     # Check unreviewed logs
     unreviewed = get_unreviewed_logs()
     if unreviewed:
-        summary.extend([
-            "\n## Pending Reviews",
-            "The following daily logs need review:\n"
-        ])
+        out.write("\n## Pending Reviews\n")
+        out.write("The following daily logs need review:\n\n")
         for log in unreviewed:
-            relative_path = os.path.relpath(log, "..")
-            summary.append(f"- `{relative_path}`")
+            relative_path = relative_to_root(log)
+            out.write(f"- `{relative_path}`\n")
     
     # Add weekly review section if it's Sunday
     if datetime.datetime.now().weekday() == 6:
-        summary.extend([
-            "\n## Weekly Review Tasks",
-            "- [ ] Review all daily logs",
-            "- [ ] Update index and tags",
-            "- [ ] Archive completed items",
-            "- [ ] Plan next week's priorities"
-        ])
-    
-    return '\n'.join(summary)
+        out.write(
+            "\n## Weekly Review Tasks\n"
+            "- [ ] Review all daily logs\n"
+            "- [ ] Update index and tags\n"
+            "- [ ] Archive completed items\n"
+            "- [ ] Plan next week's priorities\n"
+        )
 
 def main() -> None:
     """Main function to run daily review process."""
@@ -162,12 +209,14 @@ def main() -> None:
     daily_log = create_daily_log()
     print(f"\nToday's log: {os.path.relpath(daily_log, '..')}")
     
-    # Generate review summary
-    summary = generate_review_summary()
+    # Generate review summary, streaming it to a temporary file so the
+    # previous summary stays in place while the vault is scanned
     summary_path = os.path.join(DAILY_DIR, "review-summary.md")
+    tmp_path = summary_path + '.tmp'
     
-    with open(summary_path, 'w') as f:
-        f.write(summary)
+    with open(tmp_path, 'w', buffering=IO_BUFFER_SIZE) as f:
+        write_review_summary(f)
+    os.replace(tmp_path, summary_path)
     
     print(f"Review summary generated: {os.path.relpath(summary_path, '..')}")
     
@@ -7,72 +7,198 @@ files with current information about the system's structure and content.
 """
 
 import os
+import json
 import yaml
 import datetime
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YamlLoader
+
+from vault import PARALLEL_PARSE_THRESHOLD, iter_markdown_files, relative_to_root, scan_frontmatter_tags
 
 # Configuration
 INDEX_DIR = "../00-Index"
 NOTES_DIR = "../02-Notes"
 PROJECTS_DIR = "../03-Projects"
 RESOURCES_DIR = "../04-Resources"
+TAG_CACHE = os.path.join(INDEX_DIR, ".tag-cache.json")
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+READ_BUFFER_SIZE = 128 * 1024
+FRONTMATTER_READ_SIZE = 4096  # Frontmatter nearly always fits in the first block
+PARSE_CHUNKSIZE = 64
+
+def split_subtrees(directories: List[str]) -> Tuple[List[os.DirEntry], List[str]]:
+    """Split directories into their top-level markdown files and child subtrees."""
+    top_level_files = []
+    subtrees = []
+    
+    for directory in directories:
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subtrees.append(entry.path)
+                    elif entry.name.endswith('.md'):
+                        top_level_files.append(entry)
+        except OSError:
+            continue
+    
+    return top_level_files, subtrees
+
+def scan_in_parallel(
+    directories: List[str],
+    scan: Callable[[Iterable[os.DirEntry]], Any]
+) -> List[Any]:
+    """Run scan over each top-level subtree of directories in a thread pool."""
+    top_level_files, subtrees = split_subtrees(directories)
+    
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = list(executor.map(
+            lambda subtree: scan(iter_markdown_files(subtree)),
+            subtrees
+        ))
+    
+    return [scan(top_level_files)] + results
 
-def extract_yaml_frontmatter(file_path: str) -> dict:
-    """Extract YAML frontmatter from a markdown file."""
+def read_frontmatter(file_path: str) -> str:
+    """Return the raw YAML frontmatter block of a markdown file, or ''."""
     try:
-        with open(file_path, 'r') as f:
-            content = f.read()
+        with open(file_path, 'r', buffering=READ_BUFFER_SIZE) as f:
+            content = f.read(FRONTMATTER_READ_SIZE)
+            if not content.startswith('---'):
+                return ''
             
-        if content.startswith('---'):
-            _, fm, _ = content.split('---', 2)
-            return yaml.safe_load(fm) or {}
+            # Frontmatter longer than the first chunk is rare; read the rest
+            end = content.find('\n---', 3)
+            if end < 0:
+                content += f.read()
+                end = content.find('\n---', 3)
+        
+        return content[3:end] if end >= 0 else ''
     except Exception:
+        return ''
+
+def read_frontmatter_tags(file_path: str) -> List[str]:
+    """Return the tags declared in a markdown file's frontmatter."""
+    fm = read_frontmatter(file_path)
+    if not fm:
+        return []
+    
+    tags = scan_frontmatter_tags(fm)
+    if tags is not None:
+        return tags
+    
+    # Unusual YAML the scanner doesn't handle; fall back to a full parse
+    try:
+        metadata = yaml.load(fm, Loader=YamlLoader) or {}
+    except Exception:
+        return []
+    
+    tags = metadata.get('tags') if isinstance(metadata, dict) else None
+    if not tags:
+        return []
+    if isinstance(tags, str):
+        return [tags]
+    return [str(tag) for tag in tags]
+
+def load_tag_cache() -> Dict[str, list]:
+    """Load the {path: [mtime, tags]} cache written by the previous run."""
+    try:
+        with open(TAG_CACHE, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
         return {}
     
-    return {}
+    return cache if isinstance(cache, dict) else {}
 
-def collect_tags() -> Dict[str, List[str]]:
-    """Collect all tags and their associated files."""
-    tags = defaultdict(list)
+def save_tag_cache(cache: Dict[str, list]) -> None:
+    """Write the tag cache atomically so an interrupted run can't corrupt it."""
+    tmp_path = TAG_CACHE + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, TAG_CACHE)
+
+def stat_entries(
+    entries: Iterable[os.DirEntry],
+    cutoff: float,
+    cache: Dict[str, list]
+) -> Tuple[List[Tuple[str, datetime.datetime]], Dict[str, list]]:
+    """Record recent modifications and cache entries for a batch of entries.
+    
+    Tags are reused from cache for files whose mtime hasn't changed;
+    files that need parsing get None in place of their tag list.
+    """
+    recent_files = []
+    scanned = {}
+    
+    for entry in entries:
+        mtime = entry.stat().st_mtime
+        if mtime > cutoff:
+            recent_files.append((entry.path, datetime.datetime.fromtimestamp(mtime)))
+        
+        cached = cache.get(entry.path)
+        file_tags = cached[1] if cached and cached[0] == mtime else None
+        scanned[entry.path] = [mtime, file_tags]
+    
+    return recent_files, scanned
+
+def parse_tags(paths: List[str]) -> Iterable[List[str]]:
+    """Read frontmatter tags for paths, in order, across processes if many."""
+    if len(paths) < PARALLEL_PARSE_THRESHOLD:
+        return [read_frontmatter_tags(path) for path in paths]
+    
+    # Parsing is CPU-bound, so spread large batches over worker processes
+    with ProcessPoolExecutor() as executor:
+        return list(executor.map(
+            read_frontmatter_tags,
+            paths,
+            chunksize=PARSE_CHUNKSIZE
+        ))
+
+def scan_vault(
+    days: int = 7
+) -> Tuple[Dict[str, List[str]], List[Tuple[str, datetime.datetime]]]:
+    """Collect all tags and the files modified in the last N days.
     
-    # Scan directories for markdown files
-    for directory in [NOTES_DIR, PROJECTS_DIR]:
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if not file.endswith('.md'):
-                    continue
-                    
-                file_path = os.path.join(root, file)
-                metadata = extract_yaml_frontmatter(file_path)
-                
-                if 'tags' in metadata:
-                    for tag in metadata['tags']:
-                        tags[tag].append(file_path)
-    
-    return tags
-
-def find_recent_updates(days: int = 7) -> List[Tuple[str, datetime.datetime]]:
-    """Find files modified in the last N days."""
+    Both come from a single walk over the notes and projects directories.
+    Only files changed since the last run have their frontmatter parsed.
+    """
+    tags = defaultdict(list)
     recent_files = []
-    cutoff = datetime.datetime.now() - datetime.timedelta(days=days)
-    
-    for directory in [NOTES_DIR, PROJECTS_DIR]:
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if not file.endswith('.md'):
-                    continue
-                    
-                file_path = os.path.join(root, file)
-                modified_time = datetime.datetime.fromtimestamp(
-                    os.path.getmtime(file_path)
-                )
-                
-                if modified_time > cutoff:
-                    recent_files.append((file_path, modified_time))
-    
-    return sorted(recent_files, key=lambda x: x[1], reverse=True)
+    cutoff = (datetime.datetime.now() - datetime.timedelta(days=days)).timestamp()
+    cache = load_tag_cache()
+    fresh_cache = {}
+    
+    # Walk each subtree concurrently and merge the partial results
+    for recent_fragment, cache_fragment in scan_in_parallel(
+        [NOTES_DIR, PROJECTS_DIR],
+        lambda entries: stat_entries(entries, cutoff, cache)
+    ):
+        recent_files.extend(recent_fragment)
+        fresh_cache.update(cache_fragment)
+    
+    # Parse only the files that changed since the last run
+    changed = [path for path, (_, file_tags) in fresh_cache.items() if file_tags is None]
+    for path, file_tags in zip(changed, parse_tags(changed)):
+        fresh_cache[path][1] = file_tags
+    
+    for path, (_, file_tags) in fresh_cache.items():
+        for tag in file_tags:
+            tags[tag].append(path)
+    
+    for files in tags.values():
+        files.sort()
+    
+    # Files that disappeared since the last run drop out of the cache here
+    save_tag_cache(fresh_cache)
+    
+    return tags, sorted(recent_files, key=lambda x: x[1], reverse=True)
 
 def update_tags_file(tags: Dict[str, List[str]]) -> None:
     """Update the tags.md file with current tag information."""
@@ -103,7 +229,7 @@ def update_tags_file(tags: Dict[str, List[str]]) -> None:
             for tag, files in category_tags:
                 tags_content.append(f"- #{tag} ({len(files)} files)")
                 for file in files[:3]:  # Show only first 3 files
-                    relative_path = os.path.relpath(file, "..")
+                    relative_path = relative_to_root(file)
                     tags_content.append(f"  - `{relative_path}`")
             tags_content.append("\n")
     
@@ -131,7 +257,7 @@ def update_index_file(tags: Dict[str, List[str]], recent_files: List[Tuple[str,
     # Add recent updates
     index_content.append("## Recent Updates\n")
     for file_path, modified_time in recent_files[:5]:
-        relative_path = os.path.relpath(file_path, "..")
+        relative_path = relative_to_root(file_path)
         index_content.append(
             f"- {modified_time.strftime('%Y-%m-%d')}: `{relative_path}`"
         )
@@ -181,8 +307,7 @@ def main() -> None:
     print("Updating index files...")
     
     # Collect information
-    tags = collect_tags()
-    recent_files = find_recent_updates()
+    tags, recent_files = scan_vault()
     
     # Update files
     update_tags_file(tags)
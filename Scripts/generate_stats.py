@@ -8,17 +8,47 @@ usage patterns, note relationships, and system health.
 
 import os
 import re
-import yaml
+import sys
 import datetime
 from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
+
+from vault import PARALLEL_PARSE_THRESHOLD, frontmatter_tags, iter_markdown_files
 
 # Configuration
 NOTES_DIR = "../02-Notes"
 PROJECTS_DIR = "../03-Projects"
 DAILY_DIR = "../01-Daily"
 ARCHIVE_DIR = "../05-Archive"
+PARSE_CHUNKSIZE = 32
+MAX_NOTE_SIZE = 5 * 1024 * 1024  # Larger files are counted but not scanned
+
+# Patterns
+_TOKEN_RE = re.compile(r'\[\[(?P<link>.*?)\]\]|#(?P<tag>\w+)')
+
+def read_text(path: str, size: Optional[int] = None) -> str:
+    """Read a UTF-8 file with universal newlines in one bytes read.
+    
+    Passing the size already known from the directory scan saves an fstat.
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        if size is None:
+            size = os.fstat(fd).st_size
+        data = os.read(fd, size)
+        # A single read normally returns everything; keep going if it didn't
+        while len(data) < size:
+            chunk = os.read(fd, size - len(data))
+            if not chunk:
+                break
+            data += chunk
+    finally:
+        os.close(fd)
+    if b'\r' in data:
+        data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    return data.decode('utf-8')
 
 class SystemStats:
     """Collect and analyze system statistics."""
@@ -29,65 +59,109 @@ class SystemStats:
         self.archived_items = 0
         self.tags = Counter()
         self.links = defaultdict(set)
-        self.modification_dates = []
-        self.file_sizes = []
+        self.file_count = 0
+        self.total_size = 0
         self.activity_by_day = Counter()
     
-    def analyze_file(self, file_path: str) -> None:
-        """Analyze a single file for statistics."""
+    def analyze_file(self, file_path: str, st: os.stat_result) -> None:
+        """Analyze a single file for statistics, given its stat result."""
         try:
-            with open(file_path, 'r') as f:
-                content = f.read()
+            # Empty files have nothing to scan, and huge ones aren't notes
+            if st.st_size > MAX_NOTE_SIZE:
+                print(f"Skipping contents of {file_path}: larger than {MAX_NOTE_SIZE} bytes")
+                content = ''
+            else:
+                content = read_text(file_path, st.st_size) if st.st_size else ''
             
             # Count tags
             if content.startswith('---'):
-                try:
-                    _, fm, content = content.split('---', 2)
-                    metadata = yaml.safe_load(fm)
-                    if metadata and 'tags' in metadata:
-                        for tag in metadata['tags']:
-                            self.tags[tag] += 1
-                except Exception:
-                    pass
+                end = content.find('\n---', 3)
+                if end >= 0:
+                    try:
+                        self.tags.update(frontmatter_tags(content[3:end]))
+                    except Exception:
+                        pass
+                    content = content[end + len('\n---'):]
             
-            # Count inline tags
-            inline_tags = re.findall(r'#(\w+)', content)
-            for tag in inline_tags:
-                self.tags[tag] += 1
+            # Count inline tags and wiki-style links in a single scan
+            tokens = _TOKEN_RE.findall(content)
+            if tokens:
+                links, tags = zip(*tokens)
+                self.tags.update(map(sys.intern, filter(None, tags)))
+                links = set(map(sys.intern, filter(None, links)))
+                if links:
+                    self.links[file_path].update(links)
             
-            # Count wiki-style links
-            links = re.findall(r'\[\[(.*?)\]\]', content)
-            for link in links:
-                self.links[file_path].add(link)
-            
-            # Get file stats
-            stat = os.stat(file_path)
-            self.file_sizes.append(stat.st_size)
-            mod_time = datetime.datetime.fromtimestamp(stat.st_mtime)
-            self.modification_dates.append(mod_time)
+            # File stats come from the directory scan
+            self.file_count += 1
+            self.total_size += st.st_size
+            mod_time = datetime.datetime.fromtimestamp(st.st_mtime)
             self.activity_by_day[mod_time.date()] += 1
         
         except Exception as e:
             print(f"Error analyzing {file_path}: {e}")
+    
+    def merge(self, other: 'SystemStats') -> None:
+        """Fold the per-file statistics gathered by another instance into this one."""
+        self.tags.update(other.tags)
+        for file_path, links in other.links.items():
+            # Unpickled batches carry their own copies; share one per target
+            self.links[file_path].update(map(sys.intern, links))
+        self.file_count += other.file_count
+        self.total_size += other.total_size
+        self.activity_by_day.update(other.activity_by_day)
+
+def analyze_files(files: List[Tuple[str, os.stat_result]]) -> SystemStats:
+    """Analyze a batch of (path, stat) pairs into a fresh SystemStats."""
+    stats = SystemStats()
+    for file_path, st in files:
+        stats.analyze_file(file_path, st)
+    return stats
+
+def analyze_all(stats: SystemStats, files: List[Tuple[str, os.stat_result]]) -> None:
+    """Analyze (path, stat) pairs into stats, across worker processes for large vaults."""
+    if len(files) < PARALLEL_PARSE_THRESHOLD:
+        for file_path, st in files:
+            stats.analyze_file(file_path, st)
+        return
+    
+    # Parsing is CPU-bound, so analyze batches in worker processes and merge
+    batches = [
+        files[i:i + PARSE_CHUNKSIZE]
+        for i in range(0, len(files), PARSE_CHUNKSIZE)
+    ]
+    with ProcessPoolExecutor() as executor:
+        for partial in executor.map(analyze_files, batches):
+            stats.merge(partial)
+
+def stat_entries(entries: List[os.DirEntry]) -> List[Tuple[str, os.stat_result]]:
+    """Pair each entry's path with its stat result, which scandir may have cached."""
+    files = []
+    for entry in entries:
+        try:
+            files.append((entry.path, entry.stat()))
+        except OSError as e:
+            print(f"Error analyzing {entry.path}: {e}")
+    return files
+
+def count_projects() -> int:
+    """Count the project folders at the top of the projects directory."""
+    try:
+        with os.scandir(PROJECTS_DIR) as entries:
+            return sum(1 for entry in entries if entry.is_dir())
+    except OSError:
+        return 0
 
 def collect_stats() -> SystemStats:
     """Collect statistics from all system components."""
     stats = SystemStats()
     
-    # Analyze notes
-    for root, _, files in os.walk(NOTES_DIR):
-        for file in files:
-            if file.endswith('.md'):
-                stats.total_notes += 1
-                stats.analyze_file(os.path.join(root, file))
-    
-    # Analyze projects
-    for root, dirs, files in os.walk(PROJECTS_DIR):
-        if root == PROJECTS_DIR:
-            stats.total_projects = len(dirs)
-        for file in files:
-            if file.endswith('.md'):
-                stats.analyze_file(os.path.join(root, file))
+    # Analyze notes and projects
+    note_entries = list(iter_markdown_files(NOTES_DIR))
+    project_entries = list(iter_markdown_files(PROJECTS_DIR))
+    stats.total_notes = len(note_entries)
+    stats.total_projects = count_projects()
+    analyze_all(stats, stat_entries(note_entries + project_entries))
     
     # Count daily logs
     if os.path.exists(DAILY_DIR):
@@ -98,8 +172,7 @@ def collect_stats() -> SystemStats:
     
     # Count archived items
     if os.path.exists(ARCHIVE_DIR):
-        for root, _, files in os.walk(ARCHIVE_DIR):
-            stats.archived_items += len([f for f in files if f.endswith('.md')])
+        stats.archived_items = sum(1 for _ in iter_markdown_files(ARCHIVE_DIR))
     
     return stats
 
@@ -152,16 +225,16 @@ def generate_report(stats: SystemStats) -> str:
         report.append(f"- #{tag} ({count} uses)")
     
     # Add file statistics
-    if stats.file_sizes:
-        avg_size = sum(stats.file_sizes) / len(stats.file_sizes)
+    if stats.file_count:
+        avg_size = stats.total_size / stats.file_count
         report.extend([
             "\n## File Statistics",
             f"- Average File Size: {avg_size/1024:.1f} KB",
-            f"- Total Files: {len(stats.file_sizes)}"
+            f"- Total Files: {stats.file_count}"
         ])
     
     # Add recent activity
-    if stats.modification_dates:
+    if stats.file_count:
         report.extend([
             "\n## Recent Activity",
             "Last 7 days of activity:"
@@ -6,17 +6,134 @@ This script checks for broken links and suggests new connections
 between related notes.
 """
 
+import heapq
 import os
 import re
+import sys
 import yaml
+import numpy as np
+from scipy import sparse
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YamlLoader
+
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is optional; suggest_links falls back to SciPy
+    njit = None
+
+from vault import BLOCK_ITEM_RE, PARALLEL_PARSE_THRESHOLD, PLAIN_TAG_RE, ROOT_PREFIX, iter_markdown_files
 
 # Configuration
 NOTES_DIR = "../02-Notes"
 PROJECTS_DIR = "../03-Projects"
+PARSE_CHUNKSIZE = 32
+MAX_NOTE_SIZE = 5 * 1024 * 1024  # Larger files are skipped as not really notes
 MIN_SIMILARITY = 0.3  # Minimum similarity score for suggesting links
+TAG_BOOST = 0.1  # Similarity boost per shared tag
+SIMILARITY_BLOCK_ROWS = 512  # Notes scored per block in suggest_links
+COMMON_WORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at'})
+
+# Patterns
+_LINK_RE = re.compile(r'\[\[(.*?)\]\]')
+_WORD_RE = re.compile(r'\b\w+\b')
+_FRONTMATTER_KEY_RE = re.compile(r'^(title|tags):[ \t]*(.*?)[ \t]*$')
+_TITLE_RE = re.compile(r'''^(?:"([^"\\]*)"|'([^']*)'|([^\s"'#:\[\]{},&*!|>%@`][^#:]*))$''')
+_YAML_NON_STRING_RE = re.compile(
+    r'^(?:[-+.\d:_]+|\.inf|\.nan|true|false|yes|no|on|off|null|~)$',
+    re.IGNORECASE
+)
+
+def scan_frontmatter(fm: str) -> Optional[dict]:
+    """Read the title and tags from the simple frontmatter notes normally use.
+    
+    Handles plain or quoted `title:` values, and `tags: [a, "b"]` or block
+    lists of plain or quoted items. Returns None when the block needs a
+    full YAML parse instead.
+    """
+    metadata = {}
+    lines = fm.split('\n')
+    
+    for i, line in enumerate(lines):
+        match = _FRONTMATTER_KEY_RE.match(line)
+        if not match:
+            continue
+        
+        key, value = match.groups()
+        if key == 'title':
+            title = _TITLE_RE.match(value)
+            if not title or _YAML_NON_STRING_RE.match(value):
+                return None
+            metadata['title'] = next(group for group in title.groups() if group is not None)
+            continue
+        
+        if value.startswith('[') and value.endswith(']'):
+            inner = value[1:-1]
+            items = inner.split(',') if inner.strip() else []
+        elif not value:
+            items = []
+            for item_line in lines[i + 1:]:
+                item = BLOCK_ITEM_RE.match(item_line)
+                if item:
+                    items.append(item.group(1))
+                elif not item_line.strip():
+                    continue
+                elif item_line[0] in ' \t#':
+                    return None
+                else:
+                    break
+        else:
+            return None
+        
+        tags = []
+        for item in items:
+            tag = PLAIN_TAG_RE.match(item.strip())
+            if not tag:
+                return None
+            value = next(group for group in tag.groups() if group is not None)
+            tags.append(sys.intern(value))
+        metadata['tags'] = tags
+    
+    return metadata
+
+def load_frontmatter(fm: str) -> dict:
+    """Load a note's YAML frontmatter, skipping PyYAML for the common forms."""
+    metadata = scan_frontmatter(fm)
+    if metadata is None:
+        # Unusual YAML the scanner doesn't handle; fall back to a full parse
+        metadata = yaml.load(fm, Loader=YamlLoader)
+    return metadata
+
+def read_text(path: str, size: Optional[int] = None) -> str:
+    """Read a UTF-8 file with universal newlines in one bytes read.
+    
+    Decoding the whole file at once skips the text-mode I/O layer, which
+    costs more than the decode itself for typical small notes. Passing the
+    size already known from the directory scan saves an fstat.
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        if size is None:
+            size = os.fstat(fd).st_size
+        data = os.read(fd, size)
+        # A single read normally returns everything; keep going if it didn't
+        while len(data) < size:
+            chunk = os.read(fd, size - len(data))
+            if not chunk:
+                break
+            data += chunk
+    finally:
+        os.close(fd)
+    if b'\r' in data:
+        data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    return data.decode('utf-8')
 
 class Link:
     """Represents a link between notes."""
@@ -26,76 +143,122 @@ class Link:
         self.context = context.strip()
 
 class Note:
-    """Represents a note with its content and metadata."""
-    def __init__(self, path: str):
+    """Represents a note's words, links, and metadata."""
+    def __init__(self, path: str, size: Optional[int] = None):
         self.path = path
-        self.content = ""
+        self.words: FrozenSet[str] = frozenset()
         self.links: List[Link] = []
+        self.link_targets: Set[str] = set()
         self.tags: Set[str] = set()
         self.title = ""
-        self._parse()
+        self._parse(size)
     
-    def _parse(self) -> None:
-        """Parse the note to extract content, links, and metadata."""
+    def _parse(self, size: Optional[int]) -> None:
+        """Parse the note to extract words, links, and metadata.
+        
+        The file's text itself is not kept, so memory stays proportional to
+        the extracted words rather than to the whole vault.
+        """
+        # Empty files have nothing to parse, and huge ones aren't notes
+        if size == 0:
+            return
+        if size is not None and size > MAX_NOTE_SIZE:
+            print(f"Skipping {self.path}: larger than {MAX_NOTE_SIZE} bytes")
+            return
+        
         try:
-            with open(self.path, 'r') as f:
-                content = f.read()
+            content = read_text(self.path, size)
             
-            self.content = content
+            self.words = frozenset(get_words(content))
             
             # Extract YAML frontmatter
             if content.startswith('---'):
-                _, fm, content = content.split('---', 2)
-                try:
-                    metadata = yaml.safe_load(fm)
-                    if metadata:
-                        if 'title' in metadata:
-                            self.title = metadata['title']
-                        if 'tags' in metadata:
-                            self.tags.update(metadata['tags'])
-                except Exception:
-                    pass
+                end = content.find('\n---', 3)
+                if end >= 0:
+                    fm = content[3:end]
+                    content = content[end + len('\n---'):]
+                    try:
+                        metadata = load_frontmatter(fm)
+                        if metadata:
+                            if 'title' in metadata:
+                                self.title = metadata['title']
+                            if 'tags' in metadata:
+                                self.tags.update(metadata['tags'])
+                    except Exception:
+                        pass
             
             # Extract wiki-style links with context
-            for match in re.finditer(r'\[\[(.*?)\]\]', content):
-                link_target = match.group(1)
+            content_length = len(content)
+            for match in _LINK_RE.finditer(content):
+                link_target = sys.intern(match.group(1))
                 
                 # Get surrounding context (50 chars before and after)
-                start = max(0, match.start() - 50)
-                end = min(len(content), match.end() + 50)
+                start, end = match.span()
+                start = start - 50 if start > 50 else 0
+                end = end + 50 if end + 50 < content_length else content_length
                 context = content[start:end]
                 
                 self.links.append(Link(self.path, link_target, context))
+                self.link_targets.add(link_target)
         
         except Exception as e:
             print(f"Error parsing {self.path}: {e}")
 
+def file_size(entry: os.DirEntry) -> Optional[int]:
+    """Return the entry's size in bytes, or None if it can't be stat'ed."""
+    try:
+        return entry.stat().st_size
+    except OSError:
+        return None
+
+def parse_notes(paths: List[str], sizes: List[Optional[int]]) -> List[Note]:
+    """Parse notes in order, across worker processes for large vaults."""
+    if len(paths) < PARALLEL_PARSE_THRESHOLD:
+        return [Note(path, size) for path, size in zip(paths, sizes)]
+    
+    # Parsing is CPU-bound, so spread large batches over worker processes
+    with ProcessPoolExecutor() as executor:
+        return list(executor.map(Note, paths, sizes, chunksize=PARSE_CHUNKSIZE))
+
 def find_notes() -> Dict[str, Note]:
     """Find and parse all notes in the system."""
-    notes = {}
+    entries = [
+        entry
+        for directory in [NOTES_DIR, PROJECTS_DIR]
+        for entry in iter_markdown_files(directory)
+    ]
+    paths = [entry.path for entry in entries]
+    sizes = [file_size(entry) for entry in entries]
     
-    for directory in [NOTES_DIR, PROJECTS_DIR]:
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if not file.endswith('.md'):
-                    continue
-                
-                file_path = os.path.join(root, file)
-                notes[file_path] = Note(file_path)
-    
-    return notes
+    return dict(zip(paths, parse_notes(paths, sizes)))
 
-def check_links(notes: Dict[str, Note]) -> Dict[str, List[Link]]:
-    """Check for broken links in all notes."""
-    broken_links = defaultdict(list)
-    
-    # Create a mapping of note names to paths
+def build_name_index(notes: Dict[str, Note]) -> Dict[str, str]:
+    """Map each note's file name, with and without .md, to its path."""
     name_to_path = {}
     for path in notes:
-        name = os.path.basename(path)
+        name = path.rpartition(os.sep)[2]
         name_to_path[name] = path
-        name_without_ext = os.path.splitext(name)[0]
-        name_to_path[name_without_ext] = path
+        name_to_path[name[:-3] if name.endswith('.md') else name] = path
+    return name_to_path
+
+def relative_paths(notes: Dict[str, Note]) -> Dict[str, str]:
+    """Map each note's path to its path relative to the PKM root ('..')."""
+    rel_paths = {}
+    for path in notes:
+        # Paths built from the configured directories already start with '../',
+        # so avoid the normalisation work os.path.relpath does on every call
+        if path.startswith(ROOT_PREFIX):
+            rel_paths[path] = path[len(ROOT_PREFIX):]
+        else:
+            rel_paths[path] = os.path.relpath(path, "..")
+    return rel_paths
+
+def check_links(
+    notes: Dict[str, Note],
+    name_to_path: Dict[str, str]
+) -> Dict[str, List[Link]]:
+    """Check for broken links in all notes."""
+    broken_links = defaultdict(list)
     
     # Check each note's links
     for note in notes.values():
@@ -105,17 +268,16 @@ def check_links(notes: Dict[str, Note]) -> Dict[str, List[Link]]:
     
     return broken_links
 
+def get_words(text: str) -> Set[str]:
+    """Get the distinct words of a text, excluding common words."""
+    words = set(_WORD_RE.findall(text.lower()))
+    # Remove common words
+    return words - COMMON_WORDS
+
 def calculate_similarity(note1: Note, note2: Note) -> float:
     """Calculate similarity between two notes."""
-    # Get words from content (excluding common words)
-    def get_words(text: str) -> Set[str]:
-        words = set(re.findall(r'\b\w+\b', text.lower()))
-        # Remove common words
-        common_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at'}
-        return words - common_words
-    
-    words1 = get_words(note1.content)
-    words2 = get_words(note2.content)
+    words1 = note1.words
+    words2 = note2.words
     
     # Calculate Jaccard similarity
     if not words1 or not words2:
@@ -126,44 +288,190 @@ def calculate_similarity(note1: Note, note2: Note) -> float:
     
     # Boost similarity if tags overlap
     tag_overlap = len(note1.tags & note2.tags)
-    tag_boost = tag_overlap * 0.1  # 10% boost per shared tag
+    tag_boost = tag_overlap * TAG_BOOST
     
     return min(1.0, (intersection / union) + tag_boost)
 
+def build_incidence_matrix(item_sets: List[Set]) -> sparse.csr_matrix:
+    """Build a binary (sets x distinct items) matrix from a list of sets.
+    
+    Column indices are sorted within each row, so every row doubles as a
+    sorted array of integer item ids.
+    """
+    vocabulary = {}
+    indices = []
+    indptr = [0]
+    
+    for items in item_sets:
+        for item in items:
+            indices.append(vocabulary.setdefault(item, len(vocabulary)))
+        indptr.append(len(indices))
+    
+    matrix = sparse.csr_matrix(
+        (np.ones(len(indices)), indices, indptr),
+        shape=(len(item_sets), len(vocabulary))
+    )
+    matrix.sort_indices()
+    return matrix
+
+def score_pairs_blocked(
+    words: sparse.csr_matrix,
+    tags: sparse.csr_matrix
+) -> Iterator[Tuple[int, int, float]]:
+    """Yield (i, j, score) for note pairs i < j scoring at least MIN_SIMILARITY.
+    
+    Word and tag overlaps come from sparse matrix products, a block of
+    rows at a time to bound memory.
+    """
+    sizes = np.diff(words.indptr)
+    columns = np.arange(words.shape[0])
+    
+    for start in range(0, words.shape[0], SIMILARITY_BLOCK_ROWS):
+        stop = min(start + SIMILARITY_BLOCK_ROWS, words.shape[0])
+        
+        # Jaccard similarity of each row's word set against every note
+        intersection = (words[start:stop] @ words.T).toarray()
+        union = sizes[start:stop, None] + sizes[None, :] - intersection
+        similarity = np.divide(
+            intersection, union,
+            out=np.zeros_like(intersection),
+            where=union > 0
+        )
+        
+        # Boost similarity if tags overlap
+        similarity += (tags[start:stop] @ tags.T).toarray() * TAG_BOOST
+        np.minimum(similarity, 1.0, out=similarity)
+        
+        # Notes without words never match; compare each pair only once
+        candidates = similarity >= MIN_SIMILARITY
+        candidates &= (sizes[start:stop, None] > 0) & (sizes[None, :] > 0)
+        candidates &= columns[None, :] > columns[start:stop, None]
+        
+        for row, j in zip(*np.nonzero(candidates)):
+            yield start + row, j, float(similarity[row, j])
+
+if njit is not None:
+    @njit(cache=True)
+    def _count_common(ids, start1, stop1, start2, stop2):
+        """Count the ids shared by two sorted runs of ids."""
+        count = 0
+        while start1 < stop1 and start2 < stop2:
+            if ids[start1] == ids[start2]:
+                count += 1
+                start1 += 1
+                start2 += 1
+            elif ids[start1] < ids[start2]:
+                start1 += 1
+            else:
+                start2 += 1
+        return count
+    
+    @njit(cache=True)
+    def _pair_score(tokens, offs, tag_tokens, tag_offs, i, j, tag_boost):
+        """Score notes i and j with calculate_similarity's formula."""
+        intersection = _count_common(tokens, offs[i], offs[i + 1], offs[j], offs[j + 1])
+        union = (offs[i + 1] - offs[i]) + (offs[j + 1] - offs[j]) - intersection
+        tag_overlap = _count_common(
+            tag_tokens, tag_offs[i], tag_offs[i + 1], tag_offs[j], tag_offs[j + 1]
+        )
+        return min(1.0, intersection / union + tag_overlap * tag_boost)
+    
+    @njit(parallel=True, cache=True)
+    def pairwise_jaccard(tokens, offs, tag_tokens, tag_offs, min_sim, tag_boost):
+        """Return (rows, cols, scores) for note pairs i < j scoring at least min_sim.
+        
+        Note i's sorted word ids are tokens[offs[i]:offs[i + 1]], and likewise
+        for tags. Pairs come out ordered by row, then column.
+        """
+        n = len(offs) - 1
+        
+        # First pass sizes the output, so the second can fill rows in parallel
+        counts = np.zeros(n, np.int64)
+        for i in prange(n):
+            if offs[i + 1] == offs[i]:
+                continue
+            for j in range(i + 1, n):
+                if offs[j + 1] == offs[j]:
+                    continue
+                if _pair_score(tokens, offs, tag_tokens, tag_offs, i, j, tag_boost) >= min_sim:
+                    counts[i] += 1
+        
+        starts = np.zeros(n + 1, np.int64)
+        starts[1:] = np.cumsum(counts)
+        rows = np.empty(starts[n], np.int64)
+        cols = np.empty(starts[n], np.int64)
+        scores = np.empty(starts[n], np.float64)
+        
+        for i in prange(n):
+            if offs[i + 1] == offs[i]:
+                continue
+            k = starts[i]
+            for j in range(i + 1, n):
+                if offs[j + 1] == offs[j]:
+                    continue
+                score = _pair_score(tokens, offs, tag_tokens, tag_offs, i, j, tag_boost)
+                if score >= min_sim:
+                    rows[k] = i
+                    cols[k] = j
+                    scores[k] = score
+                    k += 1
+        
+        return rows, cols, scores
+
+def score_pairs(
+    words: sparse.csr_matrix,
+    tags: sparse.csr_matrix
+) -> Iterator[Tuple[int, int, float]]:
+    """Yield (i, j, score) for note pairs i < j scoring at least MIN_SIMILARITY."""
+    if njit is None:
+        yield from score_pairs_blocked(words, tags)
+        return
+    
+    rows, cols, scores = pairwise_jaccard(
+        words.indices, words.indptr, tags.indices, tags.indptr,
+        MIN_SIMILARITY, TAG_BOOST
+    )
+    yield from zip(rows.tolist(), cols.tolist(), scores.tolist())
+
 def suggest_links(notes: Dict[str, Note]) -> Dict[str, List[Tuple[str, float]]]:
-    """Suggest new links between notes based on content similarity."""
+    """Suggest new links between notes based on content similarity.
+    
+    Scores every pair with calculate_similarity's formula, computed in bulk
+    over integer-id incidence matrices of the notes' word and tag sets:
+    by a compiled kernel when Numba is installed, otherwise with SciPy.
+    """
     suggestions = defaultdict(list)
     
-    # Compare each pair of notes
     paths = list(notes.keys())
-    for i, path1 in enumerate(paths):
-        note1 = notes[path1]
+    words = build_incidence_matrix([notes[path].words for path in paths])
+    tags = build_incidence_matrix([notes[path].tags for path in paths])
+    
+    # File names a link may use to point at each note, with and without .md
+    names = [path.rpartition(os.sep)[2] for path in paths]
+    stems = [name[:-3] if name.endswith('.md') else name for name in names]
+    
+    for i, j, score in score_pairs(words, tags):
+        path1 = paths[i]
+        path2 = paths[j]
         
-        for path2 in paths[i+1:]:
-            note2 = notes[path2]
-            
-            # Skip if already linked
-            if any(link.target in path2 for link in note1.links):
-                continue
-            
-            similarity = calculate_similarity(note1, note2)
-            if similarity >= MIN_SIMILARITY:
-                suggestions[path1].append((path2, similarity))
-                suggestions[path2].append((path1, similarity))
+        # Skip if already linked
+        link_targets = notes[path1].link_targets
+        if names[j] in link_targets or stems[j] in link_targets:
+            continue
+        
+        suggestions[path1].append((path2, score))
+        suggestions[path2].append((path1, score))
     
-    # Sort suggestions by similarity
+    # Keep the top 5 suggestions by similarity
     for path in suggestions:
-        suggestions[path] = sorted(
-            suggestions[path],
-            key=lambda x: x[1],
-            reverse=True
-        )[:5]  # Keep top 5 suggestions
+        suggestions[path] = heapq.nlargest(5, suggestions[path], key=itemgetter(1))
     
     return suggestions
 
 def generate_report(
     broken_links: Dict[str, List[Link]],
-    suggestions: Dict[str, List[Tuple[str, float]]]
+    suggestions: Dict[str, List[Tuple[str, float]]],
+    rel_paths: Dict[str, str]
 ) -> str:
     """Generate a detailed link audit report."""
     report = ["# Link Audit Report\n"]
@@ -175,7 +483,7 @@ def generate_report(
             "The following links are broken and need to be fixed:\n"
         ])
         for source, links in broken_links.items():
-            relative_source = os.path.relpath(source, "..")
+            relative_source = rel_paths[source]
             report.append(f"\n### In `{relative_source}`:")
             for link in links:
                 report.extend([
@@ -193,11 +501,11 @@ def generate_report(
             if not targets:
                 continue
                 
-            relative_source = os.path.relpath(source, "..")
+            relative_source = rel_paths[source]
             report.append(f"\n### For `{relative_source}`:")
             
             for target, similarity in targets:
-                relative_target = os.path.relpath(target, "..")
+                relative_target = rel_paths[target]
                 report.append(
                     f"- `{relative_target}` "
                     f"(similarity: {similarity:.2%})"
@@ -223,7 +531,7 @@ def main() -> None:
     print(f"Found {len(notes)} notes")
     
     # Check for broken links
-    broken_links = check_links(notes)
+    broken_links = check_links(notes, build_name_index(notes))
     print(f"Found {sum(len(links) for links in broken_links.values())} broken links")
     
     # Generate link suggestions
@@ -231,7 +539,7 @@ def main() -> None:
     suggestions = suggest_links(notes)
     
     # Generate and save report
-    report = generate_report(broken_links, suggestions)
+    report = generate_report(broken_links, suggestions, relative_paths(notes))
     report_path = os.path.join(NOTES_DIR, "meta", "link-audit-report.md")
     
     os.makedirs(os.path.dirname(report_path), exist_ok=True)
@@ -6,82 +6,148 @@ This script identifies notes that lack backlinks or tags, helping maintain
 a well-connected knowledge base.
 """
 
+import heapq
 import os
 import re
-import yaml
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from vault import PARALLEL_PARSE_THRESHOLD, ROOT_PREFIX, frontmatter_tags, iter_markdown_files
 
 # Configuration
 NOTES_DIR = "../02-Notes"
 PROJECTS_DIR = "../03-Projects"
+PARSE_CHUNKSIZE = 32
+MAX_NOTE_SIZE = 5 * 1024 * 1024  # Larger files are skipped as not really notes
+
+# Patterns
+_TOKEN_RE = re.compile(r'\[\[(?P<link>.*?)\]\]|#(?P<tag>\w+)')
+_WORD_RE = re.compile(r'\w+')
+
+def read_text(path: str, size: Optional[int] = None) -> str:
+    """Read a UTF-8 file with universal newlines in one bytes read.
+    
+    Passing the size already known from the directory scan saves an fstat.
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        if size is None:
+            size = os.fstat(fd).st_size
+        data = os.read(fd, size)
+        # A single read normally returns everything; keep going if it didn't
+        while len(data) < size:
+            chunk = os.read(fd, size - len(data))
+            if not chunk:
+                break
+            data += chunk
+    finally:
+        os.close(fd)
+    if b'\r' in data:
+        data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    return data.decode('utf-8')
 
 class Note:
     """Represents a note with its metadata and connections."""
-    def __init__(self, path: str):
+    def __init__(self, path: str, size: Optional[int] = None):
         self.path = path
         self.links: Set[str] = set()
         self.backlinks: Set[str] = set()
         self.tags: Set[str] = set()
         self.has_metadata = False
-        self._parse()
+        self.word_set: FrozenSet[str] = frozenset()
+        self._parse(size)
     
-    def _parse(self) -> None:
+    def _parse(self, size: Optional[int]) -> None:
         """Parse the note to extract links, tags, and metadata."""
+        # Empty files have nothing to parse, and huge ones aren't notes
+        if size == 0:
+            return
+        if size is not None and size > MAX_NOTE_SIZE:
+            print(f"Skipping {self.path}: larger than {MAX_NOTE_SIZE} bytes")
+            return
+        
         try:
-            with open(self.path, 'r') as f:
-                content = f.read()
+            content = read_text(self.path, size)
+            
+            # Keep the note's vocabulary for similarity suggestions
+            self.word_set = frozenset(_WORD_RE.findall(content.lower()))
             
             # Check for YAML frontmatter
             if content.startswith('---'):
                 self.has_metadata = True
-                _, fm, content = content.split('---', 2)
-                try:
-                    metadata = yaml.safe_load(fm)
-                    if metadata and 'tags' in metadata:
-                        self.tags.update(metadata['tags'])
-                except Exception:
-                    pass
-            
-            # Find wiki-style links
-            self.links.update(
-                re.findall(r'\[\[(.*?)\]\]', content)
-            )
+                end = content.find('\n---', 3)
+                if end >= 0:
+                    fm = content[3:end]
+                    content = content[end + len('\n---'):]
+                    try:
+                        self.tags.update(frontmatter_tags(fm))
+                    except Exception:
+                        pass
             
-            # Find hashtag-style tags
-            self.tags.update(
-                tag[1:] for tag in re.findall(r'#(\w+)', content)
-            )
+            # Find wiki-style links and hashtag-style tags in a single scan
+            tokens = _TOKEN_RE.findall(content)
+            if tokens:
+                links, tags = zip(*tokens)
+                self.links.update(map(sys.intern, filter(None, links)))
+                self.tags.update(map(sys.intern, filter(None, tags)))
         
         except Exception as e:
             print(f"Error parsing {self.path}: {e}")
 
+def file_size(entry: os.DirEntry) -> Optional[int]:
+    """Return the entry's size in bytes, or None if it can't be stat'ed."""
+    try:
+        return entry.stat().st_size
+    except OSError:
+        return None
+
+def parse_notes(paths: List[str], sizes: List[Optional[int]]) -> List[Note]:
+    """Parse notes in order, across worker processes for large vaults."""
+    if len(paths) < PARALLEL_PARSE_THRESHOLD:
+        return [Note(path, size) for path, size in zip(paths, sizes)]
+    
+    # Parsing is CPU-bound, so spread large batches over worker processes
+    with ProcessPoolExecutor() as executor:
+        return list(executor.map(Note, paths, sizes, chunksize=PARSE_CHUNKSIZE))
+
 def find_notes() -> Dict[str, Note]:
     """Find and parse all notes in the system."""
-    notes = {}
+    entries = [
+        entry
+        for directory in [NOTES_DIR, PROJECTS_DIR]
+        for entry in iter_markdown_files(directory)
+    ]
+    paths = [entry.path for entry in entries]
+    sizes = [file_size(entry) for entry in entries]
     
-    for directory in [NOTES_DIR, PROJECTS_DIR]:
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if not file.endswith('.md'):
-                    continue
-                
-                file_path = os.path.join(root, file)
-                notes[file_path] = Note(file_path)
-    
-    return notes
+    return dict(zip(paths, parse_notes(paths, sizes)))
 
-def build_backlinks(notes: Dict[str, Note]) -> None:
-    """Build backlink relationships between notes."""
-    # Create a mapping of note names to paths
+def build_name_index(notes: Dict[str, Note]) -> Dict[str, str]:
+    """Map each note's file name, with and without .md, to its path."""
     name_to_path = {}
     for path in notes:
-        name = os.path.basename(path)
+        name = path.rpartition(os.sep)[2]
         name_to_path[name] = path
-        name_without_ext = os.path.splitext(name)[0]
-        name_to_path[name_without_ext] = path
-    
-    # Build backlinks
+        name_to_path[name[:-3] if name.endswith('.md') else name] = path
+    return name_to_path
+
+def relative_paths(notes: Dict[str, Note]) -> Dict[str, str]:
+    """Map each note's path to its path relative to the PKM root ('..')."""
+    rel_paths = {}
+    for path in notes:
+        # Paths built from the configured directories already start with '../',
+        # so avoid the normalisation work os.path.relpath does on every call
+        if path.startswith(ROOT_PREFIX):
+            rel_paths[path] = path[len(ROOT_PREFIX):]
+        else:
+            rel_paths[path] = os.path.relpath(path, "..")
+    return rel_paths
+
+def build_backlinks(notes: Dict[str, Note], name_to_path: Dict[str, str]) -> None:
+    """Build backlink relationships between notes."""
     for path, note in notes.items():
         for link in note.links:
             # Try to find the linked note
@@ -130,36 +196,28 @@ def suggest_connections(
     notes: Dict[str, Note]
 ) -> List[Tuple[str, float]]:
     """Suggest potential connections for an orphaned note."""
-    target_note = notes[note_path]
+    words = notes[note_path].word_set
     suggestions = []
     
-    # Get the note's content
-    with open(note_path, 'r') as f:
-        content = f.read().lower()
-    
     # Compare with other notes
     for other_path, other_note in notes.items():
         if other_path == note_path:
             continue
         
-        # Simple text similarity check
-        with open(other_path, 'r') as f:
-            other_content = f.read().lower()
-        
         # Count word overlap
-        words = set(re.findall(r'\w+', content))
-        other_words = set(re.findall(r'\w+', other_content))
+        other_words = other_note.word_set
         overlap = len(words & other_words)
         
         if overlap > 10:  # Arbitrary threshold
             similarity = overlap / len(words | other_words)
             suggestions.append((other_path, similarity))
     
-    return sorted(suggestions, key=lambda x: x[1], reverse=True)[:5]
+    return heapq.nlargest(5, suggestions, key=itemgetter(1))
 
 def generate_report(
     orphans: Dict[str, List[str]],
-    notes: Dict[str, Note]
+    notes: Dict[str, Note],
+    rel_paths: Dict[str, str]
 ) -> str:
     """Generate a detailed report of orphaned notes."""
     report = ["# Orphaned Notes Report\n"]
@@ -181,7 +239,7 @@ def generate_report(
             "These notes have no connections at all:\n"
         ])
         for path in orphans['isolated']:
-            relative_path = os.path.relpath(path, "..")
+            relative_path = rel_paths[path]
             report.append(f"\n### `{relative_path}`")
             
             # Add suggestions
@@ -189,7 +247,7 @@ def generate_report(
             if suggestions:
                 report.append("\nSuggested connections:")
                 for suggested_path, similarity in suggestions:
-                    rel_path = os.path.relpath(suggested_path, "..")
+                    rel_path = rel_paths[suggested_path]
                     report.append(
                         f"- `{rel_path}` "
                         f"(similarity: {similarity:.2%})"
@@ -207,7 +265,7 @@ def generate_report(
         if orphans[key] and key != 'isolated':
             report.extend([f"\n## {title}\n"])
             for path in orphans[key]:
-                relative_path = os.path.relpath(path, "..")
+                relative_path = rel_paths[path]
                 report.append(f"- `{relative_path}`")
     
     # Add recommendations
@@ -227,11 +285,11 @@ def main() -> None:
     
     # Find and analyze notes
     notes = find_notes()
-    build_backlinks(notes)
+    build_backlinks(notes, build_name_index(notes))
     orphans = find_orphans(notes)
     
     # Generate and save report
-    report = generate_report(orphans, notes)
+    report = generate_report(orphans, notes, relative_paths(notes))
     report_path = os.path.join(NOTES_DIR, "meta", "orphan-notes-report.md")
     
     os.makedirs(os.path.dirname(report_path), exist_ok=True)
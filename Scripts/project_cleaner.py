@@ -6,51 +6,158 @@ This script identifies inactive projects and moves them to the archive,
 maintaining a clean and focused project space.
 """
 
+import io
 import os
+import re
 import shutil
 import yaml
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+try:
+    from yaml import CSafeDumper as YamlDumper, CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as YamlDumper, SafeLoader as YamlLoader
+
+from vault import iter_markdown_files
 
 # Configuration
 PROJECTS_DIR = "../03-Projects"
 ARCHIVE_DIR = "../05-Archive/projects"
 ARCHIVE_LOG = os.path.join("../05-Archive", "log.md")
 INACTIVE_THRESHOLD_DAYS = 90  # 3 months
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+STATUS_FILE = "README.md"  # Holds the project's status frontmatter
+FRONTMATTER_READ_SIZE = 4096  # Frontmatter nearly always fits in the first block
+# Project subfolders whose notes don't count as live project work
+SKIPPED_DIRS = frozenset({'archive', 'assets', 'node_modules', '__pycache__'})
+LOG_BUFFER_SIZE = 64 * 1024
 
-def get_project_status(project_dir: str) -> Tuple[datetime.datetime, str]:
-    """Get the last modification time and status of a project."""
-    last_modified = datetime.datetime.fromtimestamp(0)
-    status = "unknown"
+# Frontmatter status scanning
+_STATUS_RE = re.compile(r'^status:[ \t]*(.*?)[ \t]*$', re.M)
+_PLAIN_STATUS_RE = re.compile(r'''^(?:"([^"\\]*)"|'([^']*)'|([A-Za-z_][\w-]*))$''')
+# Plain words YAML reads as booleans or null rather than strings
+_YAML_KEYWORDS = frozenset({
+    'true', 'false', 'yes', 'no', 'on', 'off', 'y', 'n', 'null'
+})
+
+# Frontmatter writing
+_PLAIN_SCALAR_RE = re.compile(r'[A-Za-z0-9_][\w./-]*(?: [\w./-]+)*')
+_RESOLVER = yaml.resolver.Resolver()
+_STR_TAG = 'tag:yaml.org,2002:str'
+
+# Markdown files found in each project while checking its status, so
+# archiving doesn't have to walk the project again
+_project_files: Dict[str, List[str]] = {}
+
+def scan_project(project_dir: str) -> Tuple[List[str], float]:
+    """Return a project's markdown files and their latest modification time."""
+    paths = []
+    latest = 0.0
+    for entry in iter_markdown_files(project_dir, SKIPPED_DIRS):
+        paths.append(entry.path)
+        try:
+            mtime = entry.stat().st_mtime
+        except OSError:
+            continue
+        if mtime > latest:
+            latest = mtime
+    return paths, latest
+
+def status_file(project_dir: str) -> Optional[str]:
+    """Return the project's README.md, or else its first top-level note."""
+    readme = os.path.join(project_dir, STATUS_FILE)
+    if os.path.isfile(readme):
+        return readme
     
-    # Check all files in the project
-    for root, _, files in os.walk(project_dir):
-        for file in files:
-            if not file.endswith('.md'):
-                continue
-            
-            file_path = os.path.join(root, file)
-            mod_time = datetime.datetime.fromtimestamp(
-                os.path.getmtime(file_path)
+    try:
+        with os.scandir(project_dir) as entries:
+            names = sorted(
+                entry.name for entry in entries
+                if entry.name.endswith('.md') and entry.is_file()
             )
-            
-            if mod_time > last_modified:
-                last_modified = mod_time
-            
-            # Try to determine status from metadata
-            try:
-                with open(file_path, 'r') as f:
-                    content = f.read()
-                if content.startswith('---'):
-                    _, fm, _ = content.split('---', 2)
-                    metadata = yaml.safe_load(fm)
-                    if metadata and 'status' in metadata:
-                        status = metadata['status']
-            except Exception:
-                pass
-    
-    return last_modified, status
+    except OSError:
+        return None
+    return os.path.join(project_dir, names[0]) if names else None
+
+def read_frontmatter(file_path: str) -> str:
+    """Return the raw YAML frontmatter block of a markdown file, or ''.
+    
+    Files that don't start with '---' cost a single small read.
+    """
+    fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        data = os.read(fd, FRONTMATTER_READ_SIZE)
+        if not data.startswith(b'---'):
+            return ''
+        
+        # Frontmatter longer than the first block is rare; read on until it ends
+        end = data.find(b'\n---', 3)
+        while end < 0:
+            chunk = os.read(fd, FRONTMATTER_READ_SIZE)
+            if not chunk:
+                return ''
+            data += chunk
+            end = data.find(b'\n---', 3)
+    finally:
+        os.close(fd)
+    
+    fm = data[3:end].decode('utf-8')
+    if '\r' in fm:
+        fm = fm.replace('\r\n', '\n').replace('\r', '\n')
+    return fm
+
+def scan_frontmatter_status(fm: str) -> Optional[str]:
+    """Read a plain or quoted `status:` value from frontmatter.
+    
+    Returns None when the block needs a full YAML parse instead.
+    """
+    values = _STATUS_RE.findall(fm)
+    if not values:
+        return "unknown"
+    
+    # YAML keeps the last of repeated keys
+    match = _PLAIN_STATUS_RE.match(values[-1])
+    if not match:
+        return None
+    quoted_double, quoted_single, plain = match.groups()
+    if plain is not None:
+        return None if plain.lower() in _YAML_KEYWORDS else plain
+    return quoted_double if quoted_double is not None else quoted_single
+
+def frontmatter_status(fm: str) -> str:
+    """Return the status listed in a project file's YAML frontmatter."""
+    status = scan_frontmatter_status(fm)
+    if status is not None:
+        return status
+    
+    # Unusual YAML the scanner doesn't handle; fall back to a full parse
+    metadata = yaml.load(fm, Loader=YamlLoader)
+    if metadata and 'status' in metadata:
+        return metadata['status']
+    return "unknown"
+
+def project_status(project_dir: str) -> str:
+    """Read a project's status from its README frontmatter."""
+    file_path = status_file(project_dir)
+    if file_path is None:
+        return "unknown"
+    
+    try:
+        fm = read_frontmatter(file_path)
+        if fm:
+            return frontmatter_status(fm)
+    except Exception:
+        pass
+    return "unknown"
+
+def get_project_status(project_dir: str) -> Tuple[datetime.datetime, str]:
+    """Get the last modification time and status of a project."""
+    paths, mtime = scan_project(project_dir)
+    _project_files[project_dir] = paths
+    return datetime.datetime.fromtimestamp(mtime), project_status(project_dir)
 
 def find_inactive_projects() -> List[Tuple[str, datetime.datetime, str]]:
     """Find projects that haven't been modified recently."""
@@ -59,116 +166,197 @@ def find_inactive_projects() -> List[Tuple[str, datetime.datetime, str]]:
         days=INACTIVE_THRESHOLD_DAYS
     )
     
-    for item in os.listdir(PROJECTS_DIR):
-        project_dir = os.path.join(PROJECTS_DIR, item)
-        if not os.path.isdir(project_dir):
-            continue
-        
-        last_modified, status = get_project_status(project_dir)
-        
+    with os.scandir(PROJECTS_DIR) as entries:
+        project_dirs = [entry.path for entry in entries if entry.is_dir()]
+    
+    # Each project is independent and mostly waits on stat calls and reads
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        project_statuses = list(executor.map(get_project_status, project_dirs))
+    
+    for project_dir, (last_modified, status) in zip(project_dirs, project_statuses):
         if (last_modified < cutoff and status != "active") or status == "completed":
             inactive_projects.append((project_dir, last_modified, status))
     
     return inactive_projects
 
-def update_project_metadata(project_dir: str) -> None:
+def update_project_metadata(project_dir: str, today: str) -> None:
     """Update metadata in project files to reflect archived status."""
-    for root, _, files in os.walk(project_dir):
-        for file in files:
-            if not file.endswith('.md'):
+    paths = _project_files.get(project_dir)
+    if paths is None:
+        paths = [entry.path for entry in iter_markdown_files(project_dir, SKIPPED_DIRS)]
+    
+    for file_path in paths:
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            
+            # Only the frontmatter is decoded; the body is copied as raw bytes
+            if not data.startswith(b'---'):
+                continue
+            end = data.find(b'\n---', 3)
+            if end < 0:
                 continue
+            fm = data[3:end].decode('utf-8')
+            # Write the new frontmatter with the note's own line endings, since
+            # the body keeps them
+            newline = '\r\n' if '\r\n' in fm else '\n'
+            if '\r' in fm:
+                fm = fm.replace('\r\n', '\n').replace('\r', '\n')
+            metadata = yaml.load(fm, Loader=YamlLoader) or {}
             
-            file_path = os.path.join(root, file)
-            try:
-                with open(file_path, 'r') as f:
-                    content = f.read()
-                
-                if content.startswith('---'):
-                    _, fm, body = content.split('---', 2)
-                    metadata = yaml.safe_load(fm) or {}
-                    
-                    # Update metadata
-                    metadata['status'] = 'archived'
-                    metadata['archived_date'] = datetime.datetime.now().strftime(
-                        '%Y-%m-%d'
-                    )
-                    
-                    # Write updated content
-                    with open(file_path, 'w') as f:
-                        f.write('---\n')
-                        yaml.dump(metadata, f)
-                        f.write('---\n')
-                        f.write(body)
+            # Update metadata
+            metadata['status'] = 'archived'
+            metadata['archived_date'] = today
             
-            except Exception as e:
-                print(f"Error updating metadata for {file_path}: {e}")
+            # Write the new note beside the old one and swap it in whole, so
+            # a failed write can't leave a truncated note behind
+            buffer = io.StringIO()
+            buffer.write('---\n')
+            formatted = format_frontmatter(metadata) if isinstance(metadata, dict) else None
+            if formatted is not None:
+                buffer.write(formatted)
+            else:
+                yaml.dump(metadata, buffer, Dumper=YamlDumper, sort_keys=False)
+            buffer.write('---\n')
+            
+            tmp_path = file_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                header = buffer.getvalue()
+                if newline != '\n':
+                    header = header.replace('\n', newline)
+                f.write(header.encode('utf-8'))
+                f.write(data[end + len('\n---'):])
+            shutil.copymode(file_path, tmp_path)
+            os.replace(tmp_path, file_path)
+        
+        except Exception as e:
+            print(f"Error updating metadata for {file_path}: {e}")
+
+def format_scalar(value: Any) -> Optional[str]:
+    """Format a scalar as YAML, or return None if it needs the full dumper."""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if value is None:
+        return 'null'
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if not isinstance(value, str) or not value.isprintable():
+        return None
+    
+    # Plain words stay bare unless YAML would read them as another type
+    if (_PLAIN_SCALAR_RE.fullmatch(value)
+            and _RESOLVER.resolve(yaml.ScalarNode, value, (True, False)) == _STR_TAG):
+        return value
+    return "'" + value.replace("'", "''") + "'"
+
+def format_frontmatter(metadata: Dict) -> Optional[str]:
+    """Write a flat frontmatter mapping by hand, keeping its key order.
+    
+    Returns None when a key or value needs the full YAML dumper.
+    """
+    lines = []
+    for key, value in metadata.items():
+        if not isinstance(key, str) or format_scalar(key) != key:
+            return None
+        
+        if isinstance(value, list):
+            if not value:
+                lines.append(f"{key}: []\n")
+                continue
+            lines.append(f"{key}:\n")
+            for item in value:
+                formatted = format_scalar(item)
+                if formatted is None:
+                    return None
+                lines.append(f"- {formatted}\n")
+        else:
+            formatted = format_scalar(value)
+            if formatted is None:
+                return None
+            lines.append(f"{key}: {formatted}\n")
+    
+    return ''.join(lines)
 
 def log_archived_project(
+    log: TextIO,
     project_dir: str,
     last_modified: datetime.datetime,
-    status: str
+    status: str,
+    today: str
 ) -> None:
-    """Log archived project details."""
+    """Log archived project details to the open archive log."""
     project_name = os.path.basename(project_dir)
-    archive_entry = (
+    log.write(
         f"\n## Archived Project: {project_name}\n"
-        f"- Archived on: {datetime.datetime.now().strftime('%Y-%m-%d')}\n"
+        f"- Archived on: {today}\n"
         f"- Last modified: {last_modified.strftime('%Y-%m-%d')}\n"
         f"- Previous status: {status}\n"
         f"- Original location: `{os.path.relpath(project_dir, '..')}`\n"
     )
-    
-    # Create or append to archive log
-    os.makedirs(os.path.dirname(ARCHIVE_LOG), exist_ok=True)
-    if not os.path.exists(ARCHIVE_LOG):
-        with open(ARCHIVE_LOG, 'w') as f:
-            f.write("# Archive Log\n\nLog of archived items.\n")
-    
-    with open(ARCHIVE_LOG, 'a') as f:
-        f.write(archive_entry)
 
 def archive_project(
+    log: TextIO,
     project_dir: str,
     last_modified: datetime.datetime,
-    status: str
+    status: str,
+    today: str
 ) -> None:
     """Archive a single project."""
     project_name = os.path.basename(project_dir)
     archive_path = os.path.join(ARCHIVE_DIR, project_name)
     
-    # Create archive directory
-    os.makedirs(ARCHIVE_DIR, exist_ok=True)
-    
     # Update metadata before moving
-    update_project_metadata(project_dir)
+    update_project_metadata(project_dir, today)
     
     # Move project to archive
     shutil.move(project_dir, archive_path)
     
     # Log the archival
-    log_archived_project(project_dir, last_modified, status)
+    log_archived_project(log, project_dir, last_modified, status, today)
+
+def archive_projects(projects: List[Tuple[str, datetime.datetime, str]]) -> None:
+    """Archive each project, logging them all through one open archive log."""
+    today = datetime.datetime.now().strftime('%Y-%m-%d')
+    
+    # Create the archive directory, and the log's directory above it, once
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    
+    # Keep the log open for the whole run so entries are written in one go
+    with open(ARCHIVE_LOG, 'a', buffering=LOG_BUFFER_SIZE) as log:
+        # Append mode starts at the end, so position 0 means a new log
+        if log.tell() == 0:
+            log.write("# Archive Log\n\nLog of archived items.\n")
+        
+        for project_dir, last_modified, status in projects:
+            try:
+                archive_project(log, project_dir, last_modified, status, today)
+                print(f"\nArchived: {os.path.basename(project_dir)}")
+            except Exception as e:
+                print(f"Error archiving {project_dir}: {e}")
 
 def generate_summary(archived_projects: List[Tuple[str, datetime.datetime, str]]) -> str:
     """Generate a summary of archived projects."""
-    summary = [
-        "# Project Archival Summary\n",
-        f"Archived on: {datetime.datetime.now().strftime('%Y-%m-%d')}\n"
-    ]
+    summary = io.StringIO()
+    write = summary.write
+    write("# Project Archival Summary\n\n")
+    write(f"Archived on: {datetime.datetime.now().strftime('%Y-%m-%d')}\n\n")
     
     if archived_projects:
-        summary.append("## Archived Projects:\n")
+        write("## Archived Projects:\n")
         for project_dir, last_modified, status in archived_projects:
             project_name = os.path.basename(project_dir)
-            summary.extend([
-                f"### {project_name}",
-                f"- Last modified: {last_modified.strftime('%Y-%m-%d')}",
-                f"- Previous status: {status}",
+            write(
+                f"\n### {project_name}\n"
+                f"- Last modified: {last_modified.strftime('%Y-%m-%d')}\n"
+                f"- Previous status: {status}\n"
                 f"- New location: `/05-Archive/projects/{project_name}`\n"
-            ])
+            )
     else:
-        summary.append("No projects were archived.\n")
+        write("No projects were archived.\n")
     
-    return '\n'.join(summary)
+    return summary.getvalue()
 
 def main() -> None:
     """Main function to clean up inactive projects."""
@@ -190,19 +378,13 @@ def main() -> None:
         )
     
     # Archive projects
-    for project_dir, last_modified, status in inactive_projects:
-        try:
-            archive_project(project_dir, last_modified, status)
-            print(f"\nArchived: {os.path.basename(project_dir)}")
-        except Exception as e:
-            print(f"Error archiving {project_dir}: {e}")
+    archive_projects(inactive_projects)
     
     # Generate and save summary
     summary = generate_summary(inactive_projects)
     summary_path = os.path.join(ARCHIVE_DIR, "archive-summary.md")
     
-    with open(summary_path, 'w') as f:
-        f.write(summary)
+    Path(summary_path).write_text(summary)
     
     print(f"\nArchival complete. Summary saved to: {summary_path}")
 
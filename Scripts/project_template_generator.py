@@ -22,7 +22,88 @@ PROJECT_TYPES = {
 }
 
 class ProjectTemplate:
-    """Base class for project templates."""
+    """Base class for project templates.
+    
+    File contents come from the *_TEMPLATE strings, filled in from the
+    template's attributes; subclasses extend them rather than the output.
+    """
+    README_TEMPLATE = (
+        "---\n"
+        "title: {name}\n"
+        "type: {project_type}\n"
+        "created: {created_date}\n"
+        "status: active\n"
+        "tags: {tags}\n"
+        "---\n"
+        "\n"
+        "# {name}\n"
+        "\n"
+        "{description}\n"
+        "\n"
+        "## Overview\n"
+        "- **Status**: Active\n"
+        "- **Type**: {project_type}\n"
+        "- **Created**: {created_date}\n"
+        "\n"
+        "## Project Structure\n"
+        "- `/docs` - Documentation and notes\n"
+        "- `/assets` - Project assets and resources\n"
+        "- `/archive` - Archived or deprecated items\n"
+        "\n"
+        "## Goals\n"
+        "1. \n"
+        "\n"
+        "## Timeline\n"
+        "- [ ] Phase 1:\n"
+        "- [ ] Phase 2:\n"
+        "- [ ] Phase 3:\n"
+        "\n"
+        "## Notes\n"
+        "- "
+    )
+    TASKS_TEMPLATE = (
+        "---\n"
+        "project: {name}\n"
+        "created: {created_date}\n"
+        "type: task-list\n"
+        "---\n"
+        "\n"
+        "# Project Tasks\n"
+        "\n"
+        "## Active Tasks\n"
+        "- [ ] Set up project structure\n"
+        "- [ ] Define initial goals and timeline\n"
+        "- [ ] Create project documentation\n"
+        "\n"
+        "## Backlog\n"
+        "- \n"
+        "\n"
+        "## Completed Tasks\n"
+        "- [x] Initialize project"
+    )
+    NOTES_TEMPLATE = (
+        "---\n"
+        "project: {name}\n"
+        "created: {created_date}\n"
+        "type: project-notes\n"
+        "---\n"
+        "\n"
+        "# Project Notes\n"
+        "\n"
+        "## Important Links\n"
+        "- \n"
+        "\n"
+        "## Meeting Notes\n"
+        "### Initial Planning\n"
+        "- Date: \n"
+        "- Attendees: \n"
+        "- Key Points:\n"
+        "  - \n"
+        "\n"
+        "## Ideas and Thoughts\n"
+        "- "
+    )
+    
     def __init__(
         self,
         name: str,
@@ -38,91 +119,20 @@ class ProjectTemplate:
     
     def get_readme_content(self) -> str:
         """Generate README.md content."""
-        return '\n'.join([
-            "---",
-            f"title: {self.name}",
-            f"type: {self.project_type}",
-            f"created: {self.created_date}",
-            f"status: active",
-            f"tags: {self.tags}",
-            "---",
-            "",
-            f"# {self.name}",
-            "",
-            f"{self.description}",
-            "",
-            "## Overview",
-            "- **Status**: Active",
-            f"- **Type**: {self.project_type}",
-            f"- **Created**: {self.created_date}",
-            "",
-            "## Project Structure",
-            "- `/docs` - Documentation and notes",
-            "- `/assets` - Project assets and resources",
-            "- `/archive` - Archived or deprecated items",
-            "",
-            "## Goals",
-            "1. ",
-            "",
-            "## Timeline",
-            "- [ ] Phase 1:",
-            "- [ ] Phase 2:",
-            "- [ ] Phase 3:",
-            "",
-            "## Notes",
-            "- "
-        ])
+        return self.README_TEMPLATE.format_map(vars(self))
     
     def get_tasks_content(self) -> str:
         """Generate tasks.md content."""
-        return '\n'.join([
-            "---",
-            f"project: {self.name}",
-            f"created: {self.created_date}",
-            "type: task-list",
-            "---",
-            "",
-            "# Project Tasks",
-            "",
-            "## Active Tasks",
-            "- [ ] Set up project structure",
-            "- [ ] Define initial goals and timeline",
-            "- [ ] Create project documentation",
-            "",
-            "## Backlog",
-            "- ",
-            "",
-            "## Completed Tasks",
-            "- [x] Initialize project"
-        ])
+        return self.TASKS_TEMPLATE.format_map(vars(self))
     
     def get_notes_content(self) -> str:
         """Generate notes.md content."""
-        return '\n'.join([
-            "---",
-            f"project: {self.name}",
-            f"created: {self.created_date}",
-            "type: project-notes",
-            "---",
-            "",
-            "# Project Notes",
-            "",
-            "## Important Links",
-            "- ",
-            "",
-            "## Meeting Notes",
-            "### Initial Planning",
-            "- Date: ",
-            "- Attendees: ",
-            "- Key Points:",
-            "  - ",
-            "",
-            "## Ideas and Thoughts",
-            "- "
-        ])
+        return self.NOTES_TEMPLATE.format_map(vars(self))
 
 class PersonalProjectTemplate(ProjectTemplate):
     """Template for personal projects."""
+    README_TEMPLATE = ProjectTemplate.README_TEMPLATE + "\n\n## Personal Goals\n- "
+    
     def __init__(self, name: str, description: str):
         super().__init__(
             name,
@@ -130,13 +140,22 @@ class PersonalProjectTemplate(ProjectTemplate):
             'personal',
             ['project-personal']
         )
-    
-    def get_readme_content(self) -> str:
-        base_content = super().get_readme_content()
-        return base_content + "\n\n## Personal Goals\n- "
 
 class ClientProjectTemplate(ProjectTemplate):
     """Template for client projects."""
+    README_TEMPLATE = ProjectTemplate.README_TEMPLATE + (
+        "\n"
+        "## Client Information\n"
+        "- **Client**: {client_name}\n"
+        "- **Deadline**: {deadline}\n"
+        "\n"
+        "## Requirements\n"
+        "- \n"
+        "\n"
+        "## Deliverables\n"
+        "- "
+    )
+    
     def __init__(
         self,
         name: str,
@@ -152,21 +171,6 @@ class ClientProjectTemplate(ProjectTemplate):
         )
         self.client_name = client_name
         self.deadline = deadline
-    
-    def get_readme_content(self) -> str:
-        base_content = super().get_readme_content()
-        return base_content + '\n'.join([
-            "",
-            "## Client Information",
-            f"- **Client**: {self.client_name}",
-            f"- **Deadline**: {self.deadline}",
-            "",
-            "## Requirements",
-            "- ",
-            "",
-            "## Deliverables",
-            "- "
-        ])
 
 def create_project_structure(template: ProjectTemplate, base_path: str) -> None:
     """Create project directory structure with template files."""
@@ -174,10 +178,15 @@ def create_project_structure(template: ProjectTemplate, base_path: str) -> None:
     project_dir = os.path.join(base_path, template.name)
     os.makedirs(project_dir, exist_ok=True)
     
-    # Create subdirectories
+    # Create subdirectories; their parent exists now, so a plain mkdir will do
     subdirs = ['docs', 'assets', 'archive']
     for subdir in subdirs:
-        os.makedirs(os.path.join(project_dir, subdir), exist_ok=True)
+        path = os.path.join(project_dir, subdir)
+        try:
+            os.mkdir(path)
+        except FileExistsError:
+            if not os.path.isdir(path):
+                raise
     
     # Create README.md
     with open(os.path.join(project_dir, 'README.md'), 'w') as f:
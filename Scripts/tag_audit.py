@@ -6,42 +6,103 @@ This script identifies redundant, unused, or overused tags and suggests
 improvements to maintain a clean and efficient tagging system.
 """
 
+import bisect
+import io
 import os
-import yaml
+import sys
 import difflib
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Dict, List, Set, Tuple
 
+from vault import PARALLEL_PARSE_THRESHOLD, frontmatter_tags, iter_markdown_files, relative_to_root
+
 # Configuration
 NOTES_DIR = "../02-Notes"
 PROJECTS_DIR = "../03-Projects"
 MIN_TAG_USAGE = 2  # Minimum number of files per tag
 MAX_TAG_SIMILARITY = 0.85  # Threshold for suggesting tag merges
+FRONTMATTER_READ_SIZE = 4096  # Frontmatter nearly always fits in the first block
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+PARSE_CHUNKSIZE = 64
+
+def read_frontmatter(file_path: str) -> str:
+    """Return the raw YAML frontmatter block of a markdown file, or ''.
+    
+    Files that don't start with '---' cost a single small read.
+    """
+    fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        data = os.read(fd, FRONTMATTER_READ_SIZE)
+        if not data.startswith(b'---'):
+            return ''
+        
+        # Frontmatter longer than the first block is rare; read on until it ends
+        end = data.find(b'\n---', 3)
+        while end < 0:
+            chunk = os.read(fd, FRONTMATTER_READ_SIZE)
+            if not chunk:
+                return ''
+            data += chunk
+            end = data.find(b'\n---', 3)
+    finally:
+        os.close(fd)
+    
+    fm = data[3:end].decode('utf-8')
+    if '\r' in fm:
+        fm = fm.replace('\r\n', '\n').replace('\r', '\n')
+    return fm
+
+def read_file_frontmatter(file_path: str) -> str:
+    """Return a file's raw frontmatter block, reporting any error."""
+    try:
+        return read_frontmatter(file_path)
+    except Exception as e:
+        print(f"Error processing {file_path}: {e}")
+        return ''
+
+def parse_file_tags(file_path: str, fm: str) -> List:
+    """Return the tags in a file's raw frontmatter, reporting any error."""
+    try:
+        return frontmatter_tags(fm) if fm else []
+    except Exception as e:
+        print(f"Error processing {file_path}: {e}")
+        return []
+
+def parse_tags(paths: List[str]) -> List[List]:
+    """Read frontmatter tags for paths, in order, concurrently if many."""
+    if len(paths) < PARALLEL_PARSE_THRESHOLD:
+        return [parse_file_tags(path, read_file_frontmatter(path)) for path in paths]
+    
+    # Reads mostly wait on storage, which is slow for synced or network
+    # vaults, so overlap them in threads before parsing
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        blocks = list(executor.map(read_file_frontmatter, paths))
+    
+    # Parsing is CPU-bound, so spread large batches over worker processes
+    with ProcessPoolExecutor() as executor:
+        return list(executor.map(
+            parse_file_tags,
+            paths,
+            blocks,
+            chunksize=PARSE_CHUNKSIZE
+        ))
 
 def collect_tag_usage() -> Dict[str, List[str]]:
     """Collect all tags and their associated files."""
     tags = defaultdict(list)
+    paths = [
+        entry.path
+        for directory in [NOTES_DIR, PROJECTS_DIR]
+        for entry in iter_markdown_files(directory)
+    ]
     
-    for directory in [NOTES_DIR, PROJECTS_DIR]:
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if not file.endswith('.md'):
-                    continue
-                    
-                file_path = os.path.join(root, file)
-                try:
-                    with open(file_path, 'r') as f:
-                        content = f.read()
-                        
-                    if content.startswith('---'):
-                        _, fm, _ = content.split('---', 2)
-                        metadata = yaml.safe_load(fm)
-                        
-                        if metadata and 'tags' in metadata:
-                            for tag in metadata['tags']:
-                                tags[tag].append(file_path)
-                except Exception as e:
-                    print(f"Error processing {file_path}: {e}")
+    for file_path, file_tags in zip(paths, parse_tags(paths)):
+        for tag in file_tags:
+            # Tags unpickled from worker processes arrive as fresh copies
+            if isinstance(tag, str):
+                tag = sys.intern(tag)
+            tags[tag].append(file_path)
     
     return tags
 
@@ -57,41 +118,53 @@ def find_similar_tags(tags: Dict[str, List[str]]) -> List[Tuple[str, str, float]
     similar_pairs = []
     tag_list = list(tags.keys())
     
-    for i, tag1 in enumerate(tag_list):
-        for tag2 in tag_list[i+1:]:
-            similarity = difflib.SequenceMatcher(None, tag1, tag2).ratio()
-            if similarity > MAX_TAG_SIMILARITY:
-                similar_pairs.append((tag1, tag2, similarity))
+    # A ratio above the threshold needs lengths within this factor of each other
+    max_len_ratio = (2 - MAX_TAG_SIMILARITY) / MAX_TAG_SIMILARITY
+    by_length = sorted(range(len(tag_list)), key=lambda k: len(tag_list[k]))
+    lengths = [len(tag_list[k]) for k in by_length]
     
-    return sorted(similar_pairs, key=lambda x: x[2], reverse=True)
+    matcher = difflib.SequenceMatcher(None)
+    for j, tag2 in enumerate(tag_list):
+        # SequenceMatcher caches its analysis of the second sequence
+        matcher.set_seq2(tag2)
+        lo = bisect.bisect_left(lengths, len(tag2) / max_len_ratio)
+        hi = bisect.bisect_right(lengths, len(tag2) * max_len_ratio)
+        for i in sorted(k for k in by_length[lo:hi] if k < j):
+            matcher.set_seq1(tag_list[i])
+            # Cheap upper bounds first; ratio() is the expensive part
+            if (matcher.real_quick_ratio() > MAX_TAG_SIMILARITY
+                    and matcher.quick_ratio() > MAX_TAG_SIMILARITY):
+                similarity = matcher.ratio()
+                if similarity > MAX_TAG_SIMILARITY:
+                    similar_pairs.append((i, j, similarity))
+    
+    # Order ties as the all-pairs scan did, by first and then second tag
+    similar_pairs.sort(key=lambda pair: (-pair[2], pair[0], pair[1]))
+    return [(tag_list[i], tag_list[j], similarity) for i, j, similarity in similar_pairs]
 
 def analyze_tag_patterns(tags: Dict[str, List[str]]) -> Dict[str, List[str]]:
     """Analyze tag patterns and suggest improvements."""
     suggestions = defaultdict(list)
-    
-    # Check for inconsistent capitalization
     lowercase_map = defaultdict(list)
+    prefixes = defaultdict(list)
+    
+    # Group by case, prefix and singular/plural form in one pass over the tags
     for tag in tags:
         lowercase_map[tag.lower()].append(tag)
+        
+        if tag.endswith('s') and tag[:-1] in tags:
+            suggestions['singular_plural'].append((tag[:-1], tag))
+        
+        prefix, dash, _ = tag.partition('-')
+        if dash:
+            prefixes[prefix].append(tag)
     
+    # Check for inconsistent capitalization
     for variants in lowercase_map.values():
         if len(variants) > 1:
             suggestions['capitalization'].extend(variants)
     
-    # Check for singular/plural inconsistencies
-    for tag in tags:
-        if tag.endswith('s'):
-            singular = tag[:-1]
-            if singular in tags:
-                suggestions['singular_plural'].append((singular, tag))
-    
     # Check for prefix/suffix patterns
-    prefixes = defaultdict(list)
-    for tag in tags:
-        parts = tag.split('-')
-        if len(parts) > 1:
-            prefixes[parts[0]].append(tag)
-    
     for prefix, prefix_tags in prefixes.items():
         if len(prefix_tags) >= 3:  # If prefix is used in 3+ tags
             suggestions['prefix_patterns'].extend(prefix_tags)
@@ -105,69 +178,61 @@ def generate_report(
     pattern_suggestions: Dict[str, List[str]]
 ) -> str:
     """Generate a detailed audit report."""
-    report = ["# Tag Audit Report\n"]
+    report = io.StringIO()
+    write = report.write
+    write("# Tag Audit Report\n\n")
     
     # Unused tags
-    report.extend([
-        "## Unused or Rare Tags\n",
-        "Tags used in fewer than {} files:\n".format(MIN_TAG_USAGE)
-    ])
+    write("## Unused or Rare Tags\n\n")
+    write(f"Tags used in fewer than {MIN_TAG_USAGE} files:\n\n")
     for tag in unused_tags:
         files = tags[tag]
-        report.append(f"- #{tag} ({len(files)} files)")
+        write(f"- #{tag} ({len(files)} files)\n")
         for file in files:
-            relative_path = os.path.relpath(file, "..")
-            report.append(f"  - `{relative_path}`")
+            relative_path = relative_to_root(file)
+            write(f"  - `{relative_path}`\n")
     
     # Similar tags
-    report.extend([
-        "\n## Potentially Redundant Tags\n",
-        "Tags that might be consolidated:\n"
-    ])
+    write("\n## Potentially Redundant Tags\n\n")
+    write("Tags that might be consolidated:\n\n")
     for tag1, tag2, similarity in similar_tags:
-        report.append(
+        write(
             f"- #{tag1} ↔ #{tag2} "
             f"(similarity: {similarity:.2%}, "
-            f"files: {len(tags[tag1])} ↔ {len(tags[tag2])})"
+            f"files: {len(tags[tag1])} ↔ {len(tags[tag2])})\n"
         )
     
     # Pattern suggestions
-    report.append("\n## Tag Pattern Analysis\n")
+    write("\n## Tag Pattern Analysis\n\n")
     
     if pattern_suggestions['capitalization']:
-        report.extend([
-            "### Inconsistent Capitalization\n",
-            "Standardize capitalization for these tag groups:\n"
-        ])
+        write("### Inconsistent Capitalization\n\n")
+        write("Standardize capitalization for these tag groups:\n\n")
         for variants in pattern_suggestions['capitalization']:
-            report.append(f"- {', '.join(f'#{v}' for v in variants)}")
+            write(f"- {', '.join(f'#{v}' for v in variants)}\n")
     
     if pattern_suggestions['singular_plural']:
-        report.extend([
-            "\n### Singular/Plural Inconsistencies\n",
-            "Choose one form for these tags:\n"
-        ])
+        write("\n### Singular/Plural Inconsistencies\n\n")
+        write("Choose one form for these tags:\n\n")
         for singular, plural in pattern_suggestions['singular_plural']:
-            report.append(f"- #{singular} ↔ #{plural}")
+            write(f"- #{singular} ↔ #{plural}\n")
     
     if pattern_suggestions['prefix_patterns']:
-        report.extend([
-            "\n### Common Prefixes\n",
-            "Consider standardizing these tag groups:\n"
-        ])
+        write("\n### Common Prefixes\n\n")
+        write("Consider standardizing these tag groups:\n\n")
         for tag in pattern_suggestions['prefix_patterns']:
-            report.append(f"- #{tag}")
+            write(f"- #{tag}\n")
     
     # Add recommendations
-    report.extend([
-        "\n## Recommendations\n",
-        "1. Remove or consolidate unused tags",
-        "2. Merge similar tags to reduce redundancy",
-        "3. Standardize capitalization and singular/plural forms",
+    write(
+        "\n## Recommendations\n\n"
+        "1. Remove or consolidate unused tags\n"
+        "2. Merge similar tags to reduce redundancy\n"
+        "3. Standardize capitalization and singular/plural forms\n"
         "4. Use consistent prefixes for related tags"
-    ])
+    )
     
-    return '\n'.join(report)
+    return report.getvalue()
 
 def main() -> None:
     """Main function to run the tag audit."""
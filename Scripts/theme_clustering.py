@@ -9,37 +9,177 @@ and generates theme-specific index files.
 import os
 import re
 import yaml
+import mmap
+import pickle
 import datetime
-from collections import defaultdict
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, FrozenSet, List, Optional, Tuple
 from dataclasses import dataclass
 import networkx as nx
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import DBSCAN
+from sklearn.feature_extraction.text import (
+    ENGLISH_STOP_WORDS, HashingVectorizer, TfidfTransformer, TfidfVectorizer
+)
+from sklearn.cluster import HDBSCAN
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+from scipy import sparse
+from scipy.sparse import csgraph
 import numpy as np
 
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YamlLoader
+
+from vault import BLOCK_ITEM_RE, PARALLEL_PARSE_THRESHOLD, PLAIN_TAG_RE, iter_markdown_files, relative_to_root
+
 # Configuration
 NOTES_DIR = "../02-Notes"
 PROJECTS_DIR = "../03-Projects"
 MIN_THEME_SIZE = 3  # Minimum notes in a theme
 SIMILARITY_THRESHOLD = 0.3  # Minimum similarity for clustering
+EMBEDDING_THRESHOLD = 5000  # From this many notes, cluster an approximate embedding
+SVD_COMPONENTS = 100  # Dimensions kept in the approximate embedding
+HASH_FEATURES = 2 ** 18  # Hashed term columns used for the approximate embedding
+MIN_TERM_NOTES = 2  # Ignore terms found in fewer notes than this
+MAX_TERM_SHARE = 0.9  # Ignore terms found in more than this share of notes
+META_DIR = os.path.join(NOTES_DIR, "meta")  # Where theme indexes are written
+NOTE_CACHE = os.path.join(META_DIR, ".theme-cache.pkl")  # Parsed notes from the last run
+NOTE_CACHE_VERSION = 2  # Bump whenever Note or its parsing changes
+PARSE_CHUNKSIZE = 32
+MMAP_THRESHOLD = 128 * 1024  # Decode notes this large straight from a memory map
+
+# Body scanning
+_LINK_RE = re.compile(r'\[\[(.*?)\]\]')
+_TAG_RE = re.compile(r'#(\w+)')
+_WORD_RE = re.compile(r'\b\w\w+\b')  # TfidfVectorizer's default token pattern
+
+# Frontmatter scanning
+_PLAIN_TITLE_RE = re.compile(r'''^(?:"([^"\\]*)"|'([^']*)'|([A-Za-z0-9_][^:#]*))$''')
+_RESOLVER = yaml.resolver.Resolver()
+_STR_TAG = 'tag:yaml.org,2002:str'
+
+def scan_scalar(value: str, pattern: re.Pattern) -> Optional[str]:
+    """Read a quoted or plain string value matching pattern.
+    
+    Returns None when YAML would read the value differently.
+    """
+    match = pattern.match(value)
+    if not match:
+        return None
+    quoted_double, quoted_single, plain = match.groups()
+    if plain is not None:
+        # Bare numbers, dates and booleans aren't strings to YAML
+        if _RESOLVER.resolve(yaml.ScalarNode, plain, (True, False)) != _STR_TAG:
+            return None
+        return plain
+    return quoted_double if quoted_double is not None else quoted_single
+
+def scan_tag_list(value: str, following: List[str]) -> Optional[List[str]]:
+    """Read a `tags:` value written as a flow list or a block list.
+    
+    Returns None when the list needs a full YAML parse instead.
+    """
+    if value.startswith('[') and value.endswith(']'):
+        inner = value[1:-1]
+        items = inner.split(',') if inner.strip() else []
+    elif not value:
+        items = []
+        for item_line in following:
+            match = BLOCK_ITEM_RE.match(item_line)
+            if match:
+                items.append(match.group(1))
+            elif not item_line.strip():
+                continue
+            elif item_line[0] in ' \t#':
+                return None
+            else:
+                break
+    else:
+        return None
+    
+    tags = []
+    for item in items:
+        tag = scan_scalar(item.strip(), PLAIN_TAG_RE)
+        if tag is None:
+            return None
+        tags.append(tag)
+    return tags
+
+def scan_frontmatter(fm: str) -> Optional[Dict[str, object]]:
+    """Read `title` and `tags` from the simple frontmatter forms notes use.
+    
+    Returns None when the block needs a full YAML parse instead.
+    """
+    metadata = {}
+    lines = fm.split('\n')
+    
+    # Later keys overwrite earlier ones, as they do in YAML
+    for i, line in enumerate(lines):
+        if line.startswith('title:'):
+            title = scan_scalar(line[len('title:'):].strip(), _PLAIN_TITLE_RE)
+            if title is None:
+                return None
+            metadata['title'] = title
+        elif line.startswith('tags:'):
+            tags = scan_tag_list(line[len('tags:'):].strip(), lines[i + 1:])
+            if tags is None:
+                return None
+            metadata['tags'] = tags
+    
+    return metadata
+
+def read_text(path: str, size: Optional[int] = None) -> str:
+    """Read a UTF-8 file with universal newlines.
+    
+    Small files take one bytes read; large ones are decoded straight from
+    a memory map rather than copied into bytes first. Passing the size
+    already known from the directory scan saves an fstat.
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        if size is None:
+            size = os.fstat(fd).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                if mm.find(b'\r') == -1:
+                    return str(mm, 'utf-8')
+                data = mm[:]
+        else:
+            data = os.read(fd, size)
+            # A single read normally returns everything; keep going if it didn't
+            while len(data) < size:
+                chunk = os.read(fd, size - len(data))
+                if not chunk:
+                    break
+                data += chunk
+    finally:
+        os.close(fd)
+    if b'\r' in data:
+        data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    return data.decode('utf-8')
 
 @dataclass
 class Note:
     """Represents a note with its content and metadata."""
+    # Declared by hand; dataclass(slots=True) needs Python 3.10
+    __slots__ = ('path', 'title', 'content', 'tags', 'links')
+    
     path: str
     title: str
     content: str
-    tags: Set[str]
-    links: Set[str]
+    tags: FrozenSet[str]
+    links: FrozenSet[str]
     
     @classmethod
-    def from_file(cls, file_path: str) -> 'Note':
+    def from_file(cls, file_path: str, size: Optional[int] = None) -> 'Note':
         """Create a Note instance from a file."""
         try:
-            with open(file_path, 'r') as f:
-                content = f.read()
+            content = read_text(file_path, size)
             
             title = os.path.splitext(os.path.basename(file_path))[0]
             tags = set()
@@ -49,7 +189,10 @@ class Note:
             if content.startswith('---'):
                 _, fm, content = content.split('---', 2)
                 try:
-                    metadata = yaml.safe_load(fm)
+                    metadata = scan_frontmatter(fm)
+                    if metadata is None:
+                        # Unusual YAML the scanner doesn't handle
+                        metadata = yaml.load(fm, Loader=YamlLoader)
                     if metadata:
                         if 'title' in metadata:
                             title = metadata['title']
@@ -59,12 +202,12 @@ class Note:
                     pass
             
             # Extract wiki-style links
-            links.update(re.findall(r'\[\[(.*?)\]\]', content))
+            links.update(_LINK_RE.findall(content))
             
             # Extract hashtag-style tags
-            tags.update(tag[1:] for tag in re.findall(r'#(\w+)', content))
+            tags.update(_TAG_RE.findall(content))
             
-            return cls(file_path, title, content, tags, links)
+            return cls(file_path, title, content, frozenset(tags), frozenset(links))
         
         except Exception as e:
             print(f"Error parsing {file_path}: {e}")
@@ -72,22 +215,34 @@ class Note:
 
 class ThemeCluster:
     """Represents a cluster of thematically related notes."""
-    def __init__(self, name: str, description: str = ""):
+    def __init__(
+        self,
+        name: str,
+        description: str = "",
+        notes: Optional[List[Note]] = None,
+        tags: Optional[Counter] = None
+    ):
         self.name = name
+        self.slug = name.lower().replace(' ', '-')
         self.description = description
-        self.notes: List[Note] = []
-        self.tags = Counter()
-        self.common_links = set()
+        self.notes: List[Note] = list(notes) if notes else []
+        # Callers that already counted the notes' tags can pass the counter in
+        if tags is None:
+            tags = Counter(chain.from_iterable(note.tags for note in self.notes))
+        self.tags = tags
+    
+    @property
+    def common_links(self) -> FrozenSet[str]:
+        """Links that appear in every note of the cluster."""
+        if not self.notes:
+            return frozenset()
+        first, *rest = self.notes
+        return first.links.intersection(*(note.links for note in rest))
     
     def add_note(self, note: Note) -> None:
         """Add a note to the cluster and update metadata."""
         self.notes.append(note)
-        for tag in note.tags:
-            self.tags[tag] += 1
-        if not self.common_links:
-            self.common_links = set(note.links)
-        else:
-            self.common_links &= set(note.links)
+        self.tags.update(note.tags)
     
     def get_summary(self) -> str:
         """Generate a summary of the theme cluster."""
@@ -100,105 +255,288 @@ class ThemeCluster:
             "\n## Notes in this Theme"
         ]
         
-        for note in sorted(self.notes, key=lambda x: x.title):
-            relative_path = os.path.relpath(note.path, "..")
+        for note in sorted(self.notes, key=attrgetter('title')):
+            relative_path = relative_to_root(note.path)
             summary.append(f"- [{note.title}]({relative_path})")
         
-        if self.common_links:
+        common_links = self.common_links
+        if common_links:
             summary.extend([
                 "\n## Common References",
                 "These links appear in multiple notes:"
             ])
-            for link in sorted(self.common_links):
+            for link in sorted(common_links):
                 summary.append(f"- [[{link}]]")
         
         return '\n'.join(summary)
 
+def load_note_cache() -> Dict[str, Tuple[float, int, Note]]:
+    """Load the {path: (mtime, size, note)} cache written by the previous run."""
+    try:
+        with open(NOTE_CACHE, 'rb') as f:
+            version, cache = pickle.load(f)
+    except Exception:
+        # A missing, truncated or incompatible cache just means a full parse
+        return {}
+    
+    # Notes parsed by another version of the parser can't be reused
+    if version != NOTE_CACHE_VERSION or not isinstance(cache, dict):
+        return {}
+    return cache
+
+def save_note_cache(cache: Dict[str, Tuple[float, int, Note]]) -> None:
+    """Write the note cache atomically so an interrupted run can't corrupt it."""
+    os.makedirs(os.path.dirname(NOTE_CACHE), exist_ok=True)
+    tmp_path = NOTE_CACHE + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump((NOTE_CACHE_VERSION, cache), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, NOTE_CACHE)
+
+def parse_notes(paths: List[str], sizes: List[int]) -> List[Optional[Note]]:
+    """Parse notes for paths, in order, across processes if many."""
+    if len(paths) < PARALLEL_PARSE_THRESHOLD:
+        return [Note.from_file(path, size) for path, size in zip(paths, sizes)]
+    
+    # Parsing is CPU-bound, so spread large batches over worker processes
+    with ProcessPoolExecutor() as executor:
+        return list(executor.map(
+            Note.from_file,
+            paths,
+            sizes,
+            chunksize=PARSE_CHUNKSIZE
+        ))
+
 def collect_notes() -> List[Note]:
-    """Collect all notes from the system."""
-    notes = []
+    """Collect all notes from the system.
+    
+    Notes whose mtime and size match the cached entry are reused instead
+    of being read and parsed again.
+    """
+    cache = load_note_cache()
+    entries = []
+    stale = []
     
     for directory in [NOTES_DIR, PROJECTS_DIR]:
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if not file.endswith('.md'):
-                    continue
-                
-                file_path = os.path.join(root, file)
-                note = Note.from_file(file_path)
-                if note:
-                    notes.append(note)
+        for entry in iter_markdown_files(directory):
+            file_path = entry.path
+            try:
+                st = entry.stat()
+            except OSError as e:
+                print(f"Error parsing {file_path}: {e}")
+                continue
+            
+            cached = cache.get(file_path)
+            if cached and cached[0] == st.st_mtime and cached[1] == st.st_size:
+                note = cached[2]
+            else:
+                note = None
+                stale.append(len(entries))
+            entries.append([file_path, st.st_mtime, st.st_size, note])
+    
+    # Parse only the new or changed notes, keeping walk order
+    parsed = parse_notes(
+        [entries[i][0] for i in stale],
+        [entries[i][2] for i in stale]
+    )
+    for i, note in zip(stale, parsed):
+        entries[i][3] = note
+    
+    notes = []
+    scanned = {}
+    for file_path, mtime, size, note in entries:
+        if note:
+            scanned[file_path] = (mtime, size, note)
+            notes.append(note)
+    
+    # Rebuild from this run's files so deleted notes drop out of the cache,
+    # but leave it alone when nothing was parsed or removed; it holds the
+    # text of every note, so rewriting it costs about the vault's size
+    if any(entries[i][3] for i in stale) or scanned.keys() != cache.keys():
+        try:
+            save_note_cache(scanned)
+        except OSError as e:
+            print(f"Warning: could not write note cache: {e}")
     
     return notes
 
-def build_similarity_matrix(notes: List[Note]) -> np.ndarray:
-    """Build a similarity matrix between notes."""
-    # Create TF-IDF vectorizer
-    vectorizer = TfidfVectorizer(
-        stop_words='english',
-        max_features=1000,
-        ngram_range=(1, 2)
-    )
+def note_terms(note: Note) -> List[str]:
+    """Split a note into the unigrams and bigrams used for TF-IDF.
     
-    # Prepare documents
-    documents = [
-        f"{note.title} {' '.join(note.tags)} {note.content}"
-        for note in notes
-    ]
+    Gives the same terms TfidfVectorizer's word analyzer would find in
+    the title, tags and content joined together, with English stop words
+    removed, without building the joined string first.
+    """
+    words = _WORD_RE.findall(str(note.title).lower())
+    for tag in note.tags:
+        words.extend(_WORD_RE.findall(tag.lower()))
+    words.extend(_WORD_RE.findall(note.content.lower()))
+    words = [word for word in words if word not in ENGLISH_STOP_WORDS]
+    
+    terms = words.copy()
+    terms.extend(map(' '.join, zip(words, words[1:])))
+    return terms
+
+def build_tfidf_matrix(notes: List[Note]) -> Optional[sparse.csr_matrix]:
+    """Vectorize notes as L2-normalised TF-IDF rows.
+    
+    Pruning by document frequency can remove every term, for instance
+    when the notes share no words or all say the same thing; the full
+    vocabulary is used then. Returns None when the notes hold no terms
+    at all, such as when they're empty or only contain stop words.
+    """
+    for min_df, max_df in ((MIN_TERM_NOTES, MAX_TERM_SHARE), (1, 1.0)):
+        # Create TF-IDF vectorizer; notes are tokenized by note_terms
+        vectorizer = TfidfVectorizer(
+            analyzer=note_terms,
+            max_features=1000,
+            min_df=min_df,
+            max_df=max_df,
+            sublinear_tf=True,  # Damp terms repeated many times in one note
+            dtype=np.float32  # Ample precision for a similarity threshold
+        )
+        
+        # Calculate TF-IDF matrix; an empty vocabulary raises ValueError
+        try:
+            return vectorizer.fit_transform(notes)
+        except ValueError:
+            continue
+    
+    return None
+
+def build_hashed_tfidf_matrix(notes: List[Note]) -> sparse.csr_matrix:
+    """Vectorize notes as TF-IDF rows over hashed terms.
     
-    # Calculate TF-IDF matrix
-    tfidf_matrix = vectorizer.fit_transform(documents)
+    Hashing needs no vocabulary, so the terms are counted in one pass
+    instead of being fitted, pruned and then counted again.
+    """
+    counts = HashingVectorizer(
+        analyzer=note_terms,
+        n_features=HASH_FEATURES,
+        alternate_sign=False,
+        norm=None,
+        dtype=np.float32
+    ).transform(notes)
     
-    # Calculate cosine similarity
-    similarity = (tfidf_matrix * tfidf_matrix.T).toarray()
+    # Keep the IDF and sublinear weighting of the exact vocabulary
+    return TfidfTransformer(sublinear_tf=True).fit_transform(counts)
+
+def build_neighbor_graph(tfidf_matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    """Build a sparse graph linking notes whose cosine similarity is high enough.
     
+    Only neighboring pairs are stored, so memory grows with the number of
+    related pairs rather than with the square of the number of notes.
+    """
+    # TF-IDF rows are L2-normalised, so the sparse product is the cosine
+    # similarity; keep only the pairs similar enough to be neighbors
+    similarity = (tfidf_matrix @ tfidf_matrix.T).tocsr()
+    similarity.data[similarity.data < SIMILARITY_THRESHOLD] = 0
+    similarity.eliminate_zeros()
     return similarity
 
+def dbscan_labels(graph: sparse.csr_matrix, min_samples: int) -> np.ndarray:
+    """Label points as DBSCAN would, given a symmetric graph of neighbors.
+    
+    Every stored entry is taken as a neighboring pair. Clusters are the
+    connected components between core points, so the expansion runs in
+    compiled graph code instead of one region query per point.
+    """
+    n = graph.shape[0]
+    labels = np.full(n, -1, dtype=np.intp)
+    
+    # Each point is its own neighbor, whether or not the diagonal is stored
+    degree = np.diff(graph.indptr) + (graph.diagonal() == 0)
+    is_core = degree >= min_samples
+    core = np.flatnonzero(is_core)
+    if not core.size:
+        return labels
+    
+    # Number the clusters by their first core point, the order DBSCAN
+    # discovers them in
+    n_clusters, component = csgraph.connected_components(
+        graph[core][:, core],
+        directed=False
+    )
+    first = np.full(n_clusters, n, dtype=np.intp)
+    np.minimum.at(first, component, core)
+    rank = np.empty(n_clusters, dtype=np.intp)
+    rank[np.argsort(first)] = np.arange(n_clusters)
+    labels[core] = rank[component]
+    
+    # Border points join the first-discovered cluster among their core
+    # neighbors; points with none stay noise
+    border = np.flatnonzero(~is_core)
+    links = graph[border][:, core]
+    linked = np.diff(links.indptr) > 0
+    if linked.any():
+        labels[border[linked]] = np.minimum.reduceat(
+            labels[core][links.indices],
+            links.indptr[:-1][linked]
+        )
+    return labels
+
+def build_embedding(tfidf_matrix: sparse.csr_matrix) -> np.ndarray:
+    """Project TF-IDF rows onto a dense low-rank embedding with unit rows."""
+    n_components = min(SVD_COMPONENTS, tfidf_matrix.shape[1] - 1)
+    # The randomized solver is seeded so unchanged notes give the same themes
+    svd = TruncatedSVD(n_components=n_components, random_state=0)
+    embedding = svd.fit_transform(tfidf_matrix)
+    return normalize(embedding)
+
 def find_clusters(notes: List[Note]) -> List[List[Note]]:
     """Find clusters of related notes."""
-    # Build similarity matrix
-    similarity_matrix = build_similarity_matrix(notes)
-    
-    # Convert similarity to distance
-    distance_matrix = 1 - similarity_matrix
-    
-    # Perform DBSCAN clustering
-    clustering = DBSCAN(
-        eps=1 - SIMILARITY_THRESHOLD,
-        min_samples=MIN_THEME_SIZE,
-        metric='precomputed'
-    ).fit(distance_matrix)
-    
-    # Group notes by cluster
-    clusters = defaultdict(list)
-    for note, label in zip(notes, clustering.labels_):
-        if label != -1:  # Ignore noise points
-            clusters[label].append(note)
-    
-    return list(clusters.values())
+    # Too few notes to form a theme, or to prune the vocabulary by
+    if len(notes) < MIN_THEME_SIZE:
+        return []
+    
+    if len(notes) < EMBEDDING_THRESHOLD:
+        # Cluster on exact cosine similarity; unstored pairs aren't neighbors
+        tfidf_matrix = build_tfidf_matrix(notes)
+        if tfidf_matrix is None:
+            return []
+        labels = dbscan_labels(build_neighbor_graph(tfidf_matrix), MIN_THEME_SIZE)
+    else:
+        # Even the sparse product gets slow for very large vaults, so build
+        # a density hierarchy over the embedding with tree-based neighbor
+        # queries. Unlike a fixed radius, it doesn't chain distinct themes
+        # together where the embedding blurs their boundaries.
+        labels = HDBSCAN(
+            min_cluster_size=MIN_THEME_SIZE,
+            n_jobs=-1,
+            copy=False
+        ).fit(build_embedding(build_hashed_tfidf_matrix(notes))).labels_
+    
+    # Group note indices by cluster with a stable sort on the labels
+    order = np.argsort(labels, kind='stable')
+    sorted_labels = labels[order]
+    
+    # Ignore noise points, which are labelled -1 and so sort first
+    start = np.searchsorted(sorted_labels, 0)
+    order = order[start:]
+    if not order.size:
+        return []
+    boundaries = np.flatnonzero(np.diff(sorted_labels[start:])) + 1
+    groups = np.split(order, boundaries)
+    
+    # List clusters in order of their first note, as the walk found them
+    groups.sort(key=lambda group: group[0])
+    return [[notes[i] for i in group] for group in groups]
 
 def analyze_cluster(notes: List[Note]) -> ThemeCluster:
     """Analyze a cluster to determine its theme and characteristics."""
     # Count all tags in the cluster
-    tag_counter = Counter()
-    for note in notes:
-        tag_counter.update(note.tags)
+    tag_counter = Counter(chain.from_iterable(note.tags for note in notes))
     
     # Use most common tags to name the theme
     top_tags = [tag for tag, _ in tag_counter.most_common(3)]
     theme_name = ' '.join(top_tags).title()
     
-    # Create theme cluster
-    cluster = ThemeCluster(
+    # Create theme cluster, reusing the tag counts
+    return ThemeCluster(
         name=theme_name,
-        description=f"A collection of {len(notes)} notes related to {', '.join(top_tags)}."
+        description=f"A collection of {len(notes)} notes related to {', '.join(top_tags)}.",
+        notes=notes,
+        tags=tag_counter
     )
-    
-    # Add notes to cluster
-    for note in notes:
-        cluster.add_note(note)
-    
-    return cluster
 
 def generate_theme_index(cluster: ThemeCluster) -> str:
     """Generate an index file for a theme."""
@@ -225,14 +563,9 @@ def main() -> None:
     
     # Generate theme indexes
     print("\nGenerating theme indexes...")
+    os.makedirs(META_DIR, exist_ok=True)
     for theme in themes:
-        index_path = os.path.join(
-            NOTES_DIR,
-            "meta",
-            f"theme-{theme.name.lower().replace(' ', '-')}.md"
-        )
-        
-        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        index_path = os.path.join(META_DIR, f"theme-{theme.slug}.md")
         with open(index_path, 'w') as f:
             f.write(generate_theme_index(theme))
         
@@ -251,10 +584,10 @@ def main() -> None:
             f"### {theme.name}",
             f"- Notes: {len(theme.notes)}",
             f"- Core Tags: {', '.join(f'#{tag}' for tag, _ in theme.tags.most_common(3))}",
-            f"- [View Full Analysis](theme-{theme.name.lower().replace(' ', '-')}.md)\n"
+            f"- [View Full Analysis](theme-{theme.slug}.md)\n"
         ])
     
-    master_index_path = os.path.join(NOTES_DIR, "meta", "theme-clusters.md")
+    master_index_path = os.path.join(META_DIR, "theme-clusters.md")
     with open(master_index_path, 'w') as f:
         f.write('\n'.join(master_index))
     
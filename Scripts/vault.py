@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+vault.py: Helpers shared by the Cognet maintenance scripts.
+
+Walking the vault for notes, reading tags from frontmatter and turning
+paths into root-relative links all live here so every script agrees on
+which notes exist and how they are named.
+"""
+
+import os
+import re
+import sys
+import yaml
+from typing import AbstractSet, Iterator, List, Optional
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YamlLoader
+
+ROOT_PREFIX = os.pardir + os.sep
+PARALLEL_PARSE_THRESHOLD = 256  # Below this, process start-up costs more than it saves
+
+# Frontmatter tag scanning
+BLOCK_ITEM_RE = re.compile(r'^[ \t]*-[ \t]+(.*?)[ \t]*$')
+PLAIN_TAG_RE = re.compile(r'''^(?:"([^"\\]*)"|'([^']*)'|([\w/-]+))$''')
+
+def iter_markdown_files(directory: str,
+                        skipped: AbstractSet[str] = frozenset()) -> Iterator[os.DirEntry]:
+    """Yield a DirEntry for every markdown file below directory.
+    
+    Every subdirectory is walked, hidden ones included, except those whose
+    name is in skipped. Symlinked directories are not followed.
+    """
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        subdirs = []
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in skipped:
+                            subdirs.append(entry.path)
+                    elif entry.name.endswith('.md'):
+                        yield entry
+        except OSError:
+            continue
+        
+        # Visit subdirectories in listing order, like os.walk
+        pending.extend(reversed(subdirs))
+
+def relative_to_root(path: str) -> str:
+    """Return path relative to the PKM root ('..')."""
+    # Paths built from the configured directories already start with '../',
+    # so avoid the normalisation work os.path.relpath does on every call
+    if path.startswith(ROOT_PREFIX):
+        return path[len(ROOT_PREFIX):]
+    return os.path.relpath(path, "..")
+
+def scan_frontmatter_tags(fm: str) -> Optional[List[str]]:
+    """Read tags from the simple frontmatter forms notes normally use.
+    
+    Handles `tags: [a, "b"]` and block lists of plain or quoted items.
+    Returns None when the block needs a full YAML parse instead.
+    """
+    lines = fm.split('\n')
+    for i, line in enumerate(lines):
+        if not line.startswith('tags:'):
+            continue
+        value = line[len('tags:'):].strip()
+        if value.startswith('[') and value.endswith(']'):
+            inner = value[1:-1]
+            items = inner.split(',') if inner.strip() else []
+        elif not value:
+            items = []
+            for item_line in lines[i + 1:]:
+                match = BLOCK_ITEM_RE.match(item_line)
+                if match:
+                    items.append(match.group(1))
+                elif not item_line.strip():
+                    continue
+                elif item_line[0] in ' \t#':
+                    return None
+                else:
+                    break
+        else:
+            return None
+        tags = []
+        for item in items:
+            match = PLAIN_TAG_RE.match(item.strip())
+            if not match:
+                return None
+            value = next(group for group in match.groups() if group is not None)
+            tags.append(sys.intern(value))
+        return tags
+    return []
+
+def frontmatter_tags(fm: str) -> List:
+    """Return the tags listed in a note's YAML frontmatter."""
+    tags = scan_frontmatter_tags(fm)
+    if tags is not None:
+        return tags
+    
+    # Unusual YAML the scanner doesn't handle; fall back to a full parse
+    metadata = yaml.load(fm, Loader=YamlLoader)
+    if metadata and 'tags' in metadata:
+        return list(metadata['tags'])
+    return []